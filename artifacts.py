@@ -0,0 +1,57 @@
+"""Files derived from the raw extracts, and whether they are still current.
+
+``python backends.py build`` writes the Parquet artifact plus two small JSON
+files next to it: the data-quality report and the national KPI summary that
+the dashboard paints while the full dataset is still loading. The summary
+records the size and mtime of the files it was computed from, so a summary
+older than its sources, or one missing a KPI the registry now declares, is
+ignored (and rewritten) instead of showing stale figures. It imports nothing
+heavy, so the dashboard can use it before pandas loads.
+"""
+import json
+import os
+
+from metrics import TAB_METRIC_KEYS
+
+PARQUET_PATH = os.path.join("data", "udise.parquet")
+
+
+def quality_path(parquet_path):
+    """Where `build` keeps the data-quality report that goes with a Parquet file."""
+    return os.path.splitext(parquet_path)[0] + ".quality.json"
+
+
+def summary_path(parquet_path):
+    """Where the national KPI summary shown during fast start is kept."""
+    return os.path.splitext(parquet_path)[0] + ".summary.json"
+
+
+def source_stamp(paths):
+    """path → [size, mtime] for each of `paths` that exists."""
+    stamp = {}
+    for path in paths:
+        if os.path.exists(path):
+            st = os.stat(path)
+            stamp[path] = [st.st_size, st.st_mtime]
+    return stamp
+
+
+def save_summary(summary, path, sources):
+    with open(path, "w") as f:
+        json.dump({**summary, "sources": source_stamp(sources)}, f, indent=1)
+
+
+def load_summary(path, metrics=TAB_METRIC_KEYS):
+    """The saved summary, or None if it is missing, lacks any of `metrics`, or
+    any of its sources has changed since."""
+    try:
+        with open(path) as f:
+            summary = json.load(f)
+    except (OSError, ValueError):
+        return None
+    recorded = summary.get("sources")
+    if not recorded or source_stamp(recorded) != recorded:
+        return None
+    if not set(metrics) <= set(summary.get("kpis", {})):
+        return None
+    return summary
@@ -0,0 +1,280 @@
+"""Aggregation backends for the dashboard.
+
+Both backends answer the same questions for a set of sidebar filters: which
+schools match, the overall mean of some metric columns, and the mean of those
+columns per group (state / district / management / location).
+
+- ``PandasBackend`` works on the in-memory frame from ``prepare_data()`` and
+  is the default.
+- ``DuckDBBackend`` runs the same aggregations as SQL over Parquet files with
+  an embedded DuckDB engine, so national data never has to sit in pandas.
+  Filters become WHERE clauses and the group-bys run as multi-threaded,
+  out-of-core scans.
+
+Filters are a dict of column → selected values; ``None`` means "no filter on
+this column" (the District box when nothing is picked), an empty list matches
+nothing, exactly like ``Series.isin([])``.
+
+Build the Parquet artifact and check the two backends against each other with:
+
+    python backends.py build  --out data/udise.parquet
+    python backends.py check  --parquet data/udise.parquet
+"""
+import argparse
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from artifacts import PARQUET_PATH, quality_path, save_summary, summary_path
+from data_prep import (CODE_LABELS, FAC_FILE_PATH, METRIC_COLUMNS, PROF_FILE_PATH, default_filters,
+                       filter_options, load_dataset, prepare_data)
+
+
+class PandasBackend:
+    name = "pandas"
+    MASK_CACHE_SIZE = 8   # a dashboard rerun asks for several aggregates of one filter set
+
+    def __init__(self, df):
+        self.df = df
+        self._masks = OrderedDict()
+        self._lock = threading.Lock()
+
+    def mask(self, filters):
+        key = _filters_key(filters)
+        with self._lock:
+            if key in self._masks:
+                self._masks.move_to_end(key)
+                return self._masks[key]
+        mask = np.ones(len(self.df), dtype=bool)
+        for colname, values in filters.items():
+            if values is None:
+                continue
+            mask &= self.df[colname].isin(values).to_numpy()
+        with self._lock:
+            self._masks[key] = mask
+            if len(self._masks) > self.MASK_CACHE_SIZE:
+                self._masks.popitem(last=False)
+        return mask
+
+    def filter(self, filters, columns=None):
+        # select the columns first so only they are copied, not the whole frame
+        columns = self.df.columns if columns is None else list(dict.fromkeys(columns))
+        return self.df.loc[self.mask(filters), columns]
+
+    def count(self, filters):
+        return int(self.mask(filters).sum())
+
+    def means(self, cols, filters):
+        return self.filter(filters, cols).mean()
+
+    def means_by(self, by, cols, filters):
+        return self.filter(filters, [by, *cols]).groupby(by)[list(cols)].mean()
+
+    def count_by(self, by, filters):
+        return self.filter(filters, [by]).groupby(by).size()
+
+    def iter_rows(self, filters, columns=None, chunksize=100_000):
+        # slice the positional index chunk by chunk so only one chunk is ever copied
+        # nothing matched: still yield one empty chunk so writers get the columns and dtypes
+        rows = np.flatnonzero(self.mask(filters))
+        cols = self.df.columns if columns is None else list(columns)
+        for start in range(0, max(len(rows), 1), chunksize):
+            yield self.df.iloc[rows[start:start + chunksize]][cols]
+
+    def filter_options(self):
+        return filter_options(self.df)
+
+
+class DuckDBBackend:
+    name = "duckdb"
+
+    def __init__(self, path=PARQUET_PATH, threads=None, memory_limit=None):
+        import duckdb
+
+        self.path = path
+        self.con = duckdb.connect()
+        if threads:
+            self.con.execute(f"SET threads = {int(threads)}")
+        if memory_limit:
+            self.con.execute(f"SET memory_limit = {_literal(memory_limit)}")
+        self.con.execute(
+            f"CREATE VIEW schools AS SELECT * FROM read_parquet({_literal(path)})"
+        )
+
+    def _query(self, sql, params=()):
+        # one cursor per query: the connection is shared by every session
+        return self.con.cursor().execute(sql, list(params)).fetchdf()
+
+    def _where(self, filters, *extra):
+        clauses, params = list(extra), []
+        for colname, values in filters.items():
+            if values is None:
+                continue
+            if len(values) == 0:
+                clauses.append("FALSE")
+                continue
+            clauses.append(f"{_ident(colname)} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def filter(self, filters, columns=None):
+        where, params = self._where(filters)
+        select = "*" if columns is None else ", ".join(_ident(c) for c in dict.fromkeys(columns))
+        return self._query(f"SELECT {select} FROM schools{where}", params)
+
+    def count(self, filters):
+        where, params = self._where(filters)
+        return int(self._query(f"SELECT COUNT(*) AS n FROM schools{where}", params)["n"][0])
+
+    def means(self, cols, filters):
+        where, params = self._where(filters)
+        select = ", ".join(f"AVG({_ident(c)}) AS {_ident(c)}" for c in cols)
+        return self._query(f"SELECT {select} FROM schools{where}", params).iloc[0].astype(float)
+
+    def means_by(self, by, cols, filters):
+        # pandas drops NaN group keys, so leave out NULLs here too
+        where, params = self._where(filters, f"{_ident(by)} IS NOT NULL")
+        select = ", ".join(f"AVG({_ident(c)}) AS {_ident(c)}" for c in cols)
+        out = self._query(
+            f"SELECT {_ident(by)}, {select} FROM schools{where}"
+            f" GROUP BY {_ident(by)} ORDER BY {_ident(by)}",
+            params,
+        )
+        return out.set_index(by).astype(float)
+
+    def count_by(self, by, filters):
+        where, params = self._where(filters, f"{_ident(by)} IS NOT NULL")
+        out = self._query(
+            f"SELECT {_ident(by)}, COUNT(*) AS n FROM schools{where}"
+            f" GROUP BY {_ident(by)} ORDER BY {_ident(by)}",
+            params,
+        )
+        return out.set_index(by)["n"]
+
+    def iter_rows(self, filters, columns=None, chunksize=100_000):
+        where, params = self._where(filters)
+        select = "*" if columns is None else ", ".join(_ident(c) for c in columns)
+        cur = self.con.cursor()
+        cur.execute(f"SELECT {select} FROM schools{where}", params)
+        reader, empty = cur.fetch_record_batch(chunksize), True
+        for batch in reader:
+            empty = False
+            yield batch.to_pandas()
+        if empty:
+            # like PandasBackend: one empty chunk carrying the columns
+            yield reader.schema.empty_table().to_pandas()
+
+    def filter_options(self):
+        pairs = self._query(
+            "SELECT DISTINCT state, district FROM schools"
+            " WHERE state IS NOT NULL ORDER BY state, district"
+        )
+        districts = pairs.dropna(subset=["district"]).groupby("state")["district"].agg(list)
+        return {
+            "state":     sorted(pairs["state"].unique()),
+            "districts": {state: sorted(d) for state, d in districts.items()},
+            **{colname: list(labels.values()) for colname, labels in CODE_LABELS.items()},
+        }
+
+
+def _filters_key(filters):
+    return tuple(sorted(
+        (colname, None if values is None else tuple(values)) for colname, values in filters.items()
+    ))
+
+
+def _ident(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _literal(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def write_summary(backend, path, sources):
+    """Save school count and national KPIs for the dashboard's opening filters,
+    stamped with the `sources` files they were computed from."""
+    filters = default_filters(backend.filter_options())
+    summary = {
+        "schools": backend.count(filters),
+        "kpis":    {k: float(v) for k, v in backend.means(METRIC_COLUMNS, filters).items()},
+    }
+    save_summary(summary, path, sources)
+
+
+def write_parquet(df, path=PARQUET_PATH):
+    """Write the prepared frame as Parquet, sorted so row groups prune on state."""
+    df.sort_values(["state", "district"]).to_parquet(path, index=False, row_group_size=100_000)
+
+
+def compare_backends(a, b, filters, cols, groups=("state", "management", "location"), rtol=1e-9):
+    """Return a list of mismatches between two backends for one filter set."""
+    problems = []
+    if a.count(filters) != b.count(filters):
+        problems.append(f"count: {a.count(filters)} != {b.count(filters)}")
+    try:
+        pd.testing.assert_series_equal(
+            a.means(cols, filters), b.means(cols, filters),
+            check_names=False, check_dtype=False, rtol=rtol,
+        )
+    except AssertionError as e:
+        problems.append(f"means: {e}")
+    for by in groups:
+        try:
+            pd.testing.assert_frame_equal(
+                a.means_by(by, cols, filters).sort_index(),
+                b.means_by(by, cols, filters).sort_index(),
+                check_names=False, check_dtype=False, check_index_type=False, rtol=rtol,
+            )
+        except AssertionError as e:
+            problems.append(f"means_by({by}): {e}")
+    return problems
+
+
+def check_cases(opts):
+    """Filter sets the backends are compared on: name → filters."""
+    everything = default_filters(opts)
+    first_state = opts["state"][:1]
+    return {
+        "all schools":     everything,
+        "one state":       {**everything, "state": first_state},
+        "one district":    {**everything, "state": first_state,
+                            "district": opts["districts"].get(first_state[0], [])[:1] if first_state else []},
+        "rural government": {**everything, "location": ["Rural"], "management": ["Government"]},
+        "nothing selected": {**everything, "state": []},
+    }
+
+
+def _check(parquet):
+    df = prepare_data()
+    pandas_be, duck_be = PandasBackend(df), DuckDBBackend(parquet)
+    failed = False
+    for name, filters in check_cases(pandas_be.filter_options()).items():
+        problems = compare_backends(pandas_be, duck_be, filters, METRIC_COLUMNS)
+        print(f"{name:<18} {'OK' if not problems else 'MISMATCH'}")
+        for p in problems:
+            print("   ", p)
+        failed |= bool(problems)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    build = sub.add_parser("build", help="write the prepared dataset to Parquet")
+    build.add_argument("--out", default=PARQUET_PATH)
+    check = sub.add_parser("check", help="compare the pandas and DuckDB backends")
+    check.add_argument("--parquet", default=PARQUET_PATH)
+    args = parser.parse_args()
+
+    if args.cmd == "build":
+        df, report = load_dataset()
+        write_parquet(df, args.out)
+        report.save(quality_path(args.out))
+        write_summary(PandasBackend(df), summary_path(args.out), [PROF_FILE_PATH, FAC_FILE_PATH, args.out])
+        print(f"Wrote {args.out} ({os.path.getsize(args.out)/1024**2:.2f} MB)")
+    else:
+        raise SystemExit(_check(args.parquet))
@@ -1,8 +1,15 @@
+import time
+_T0 = time.perf_counter()
+
 import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.express as px
-import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import artifacts                    # paths + json only, no pandas
+import geo                          # json only, no pandas
+from metrics import METRICS, TABS   # plain dataclasses, no pandas
 
 # ─── Page Setup & Styling ─────────────────────────────────────────────────────
 st.set_page_config(page_title="UDISE+ Infrastructure Dashboard", layout="wide")
@@ -28,146 +35,277 @@ ACCENT    = "#4ECDC4"   # a fresh mint-green
 
 
 # ─── Load & Prepare Data ─────────────────────────────────────────────────────
-@st.cache_data
-def load_data():
-    # 1. Read the raw CSVs
-    #prof = pd.read_csv("data/100_prof1.csv")     # profile data
-    prof = pd.read_csv("data/100_prof1.csv")
-    #fac  = pd.read_csv("data/100_prof1.csv")    # facility data
-    fac = pd.read_csv("data/100_fac.csv")
-
-    #st.write("📋 prof.columns:", prof.columns.tolist())
-    #st.write("📋 fac.columns: ",  fac.columns.tolist())
-
-    # 2. Rename profile columns that don’t match our variables
-    prof = prof.rename(columns={
-        "managment":              "management",
-        "rural_urban":            "location",
-        "school_category":        "category",
-        "minority_school":        "minority",
-        "resi_school":            "residential",
-        "special_school_for_cwsn":"special_cwsn"
-    })
-
-    # 3. Rename facility columns that don’t match our variables
-    fac = fac.rename(columns={
-        "availability_ramps":        "ramps",
-        "availability_of_handrails": "handrails",
-        "comp_ict_lab_yn":           "ict_lab"
-    })
-
-    # 4. Merge on the common key
-    df = prof.merge(fac, on="pseudocode", how="inner")
-
-    # 5. Feature‐engineering core flags & indices
-    df["func_electricity"]      = df["electricity_availability"] == 1
-    df["func_water"]            = df["tap_fun_yn"] == 1
-    df["func_handwash"]         = df["handwash_facility_for_meal"] == 1
-    df["playground"]            = df["playground_available"] == 1
-    df["library"]               = df["library_availability"] == 1
-    df["internet"]              = df["internet"] == 1
-    df["ramps"]                 = df["ramps"] == 1
-    df["handrails"]             = df["handrails"] == 1
-    df["pct_toilet_func_girls"] = (
-        df["total_girls_func_toilet"] / df["total_girls_toilet"]
-    )
-    df["computer_yn"] = np.where(df["desktop"] > 0, 1, 0)
+# UDISE_BACKEND=duckdb serves every aggregation as SQL over the Parquet artifact
+# written by `python backends.py build`; pandas stays the default.
+# With fast start (the default; UDISE_FAST_START=0 turns it off) the page chrome
+# and the cached national KPIs render while pandas, plotly, the geojson and the
+# dataset load on background threads.
+BACKEND      = os.environ.get("UDISE_BACKEND", "pandas")
+PARQUET_FILE = os.environ.get("UDISE_PARQUET", os.path.join("data", "udise.parquet"))
+FAST_START   = os.environ.get("UDISE_FAST_START", "1") != "0"
+
+log = logging.getLogger("udise.dashboard")
+
+
+def _timed(profile, phase, fn):
+    start = time.perf_counter()
+    try:
+        return fn()
+    finally:
+        profile[phase] = time.perf_counter() - start
+
+
+def _import_libs():
+    import pandas, plotly.express  # noqa: F401
+    import backends, data_prep, export, timeseries, validate  # noqa: F401
+
+
+def _load_backend():
+    from backends import DuckDBBackend, PandasBackend, write_summary
+    from data_prep import FAC_FILE_PATH, PROF_FILE_PATH, load_dataset
+    from validate import DataQualityReport
+
+    if BACKEND == "duckdb":
+        path = artifacts.quality_path(PARQUET_FILE)
+        report = DataQualityReport.load(path) if os.path.exists(path) else None
+        backend, sources = DuckDBBackend(PARQUET_FILE), [PARQUET_FILE]
+    else:
+        # one shared, read-only frame (+ its data-quality report) for every session
+        df, report = load_dataset()
+        backend, sources = PandasBackend(df), [PROF_FILE_PATH, FAC_FILE_PATH]
+
+    summary = artifacts.summary_path(PARQUET_FILE)
+    if artifacts.load_summary(summary) is None:
+        try:
+            write_summary(backend, summary, sources)   # seeds the next cold start
+        except OSError:
+            pass
+    return backend, report
+
+
+@st.cache_resource
+def start_loading():
+    profile = {}
+    pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="udise-load")
+    jobs = {
+        "libs":    pool.submit(_timed, profile, "import pandas/plotly", _import_libs),
+        "geojson": pool.submit(_timed, profile, "parse geojson", geo.load_geojson),
+        "data":    pool.submit(_timed, profile, "load dataset", _load_backend),
+    }
+    pool.shutdown(wait=False)
+    return jobs, profile
+
+
+def cached_kpis():
+    return artifacts.load_summary(artifacts.summary_path(PARQUET_FILE))
 
-    binary_cols = [
-    "func_electricity",
-    "func_water",
-    "pct_toilet_func_girls",
-    "func_handwash",
-    "ramps",
-    "handrails",
-    "internet",
-    "ict_lab"
 
-    ]
+def skeleton_view(summary):
+    st.info("Loading the full dataset — national figures below are from the last preprocessing run.")
+    if summary is None:
+        return
+    st.caption(f"{summary['schools']:,} schools")
+    for tab in TABS:
+        st.subheader(tab.title)
+        for key, slot in zip(tab.kpis, st.columns(len(tab.kpis))):
+            slot.metric(METRICS[key].label, format(summary["kpis"][key], METRICS[key].fmt))
 
-    for col in binary_cols:
-        df[col] = (df[col] == 1).astype(int)
 
-    df["infra_index"] = df[
-        ["func_electricity","func_water","pct_toilet_func_girls","func_handwash"]
-    ].mean(axis=1)
+def get_backend():
+    return start_loading()[0]["data"].result()[0]
 
-    df["equity_index"] = df[
-        ["ramps","handrails","pct_toilet_func_girls"]
-    ].mean(axis=1)
 
-    # 6. Decode all the code‐variables into human labels
-    df["location"]     = df["location"].map({1:"Rural",2:"Urban"})
-    df["management"]   = df["management"].map({1:"Government",2:"Government Aided",3:"Private"})
-    df["category"]     = df["category"].map({1:"Primary",2:"Upper Primary",3:"Secondary",4:"Higher Secondary"})
-    df["minority"]     = df["minority"].map({1:"Yes",2:"No"})
-    df["residential"]  = df["residential"].map({1:"Completely",2:"Partially",3:"Non-residential"})
-    df["special_cwsn"] = df["special_cwsn"].map({1:"Yes",2:"No"})
+def get_quality_report():
+    return start_loading()[0]["data"].result()[1]
 
-    return df
+
+def load_geojson():
+    return start_loading()[0]["geojson"].result()
+
+
+@st.cache_resource
+def feature_names(_gj):
+    return geo.feature_names(_gj)
+
+
+jobs, startup = start_loading()
+st.sidebar.header("Filters")
+if FAST_START and not all(job.done() for job in jobs.values()):
+    sidebar_wait, skeleton = st.sidebar.empty(), st.empty()
+    sidebar_wait.caption("Loading filters…")
+    with skeleton.container():
+        skeleton_view(cached_kpis())
+    startup.setdefault("first paint", time.perf_counter() - _T0)
+else:
+    sidebar_wait = skeleton = None
 
 #df = load_data()
 
 try:
-    df = load_data()
+    with st.spinner("Loading data…"):
+        for job in jobs.values():
+            job.result()
+    backend = get_backend()
     st.success("Data loaded successfully! Continuing with app...") # This will only show if load_data completes
 except Exception as e:
+    start_loading.clear()   # retry on the next rerun instead of caching the failure
     st.error(f"An error occurred during data loading: {e}")
     st.exception(e) # This will print the full traceback on the app
     st.stop() # Stop the app execution if data loading fails
 
-# ─── Sidebar Filters ─────────────────────────────────────────────────────────
-st.sidebar.header("Filters")
-state_sel    = st.sidebar.multiselect("State",  sorted(df.state.unique()), default=sorted(df.state.unique()))
-district_sel = st.sidebar.multiselect("District", sorted(df[df.state.isin(state_sel)].district.unique()))
-loc_sel      = st.sidebar.multiselect("Location", ["Rural","Urban"], default=["Rural","Urban"])
-mgmt_sel     = st.sidebar.multiselect("Management", ["Government","Government Aided","Private"], default=["Government","Government Aided","Private"])
-cat_sel      = st.sidebar.multiselect("Category", ["Primary","Upper Primary","Secondary","Higher Secondary"], default=["Primary","Upper Primary","Secondary","Higher Secondary"])
-minority_sel = st.sidebar.multiselect("Minority-managed", ["Yes","No"], default=["Yes","No"])
-resi_sel     = st.sidebar.multiselect("Residential", ["Completely","Partially","Non-residential"], default=["Completely","Partially","Non-residential"])
-cwsn_sel     = st.sidebar.multiselect("CWSN-only", ["Yes","No"], default=["Yes","No"])
-
-mask = (
-    df.state.isin(state_sel) &
-    (df.district.isin(district_sel) if district_sel else True) &
-    df.location.isin(loc_sel) &
-    df.management.isin(mgmt_sel) &
-    df.category.isin(cat_sel) &
-    df.minority.isin(minority_sel) &
-    df.residential.isin(resi_sel) &
-    df.special_cwsn.isin(cwsn_sel)
-)
+if skeleton is not None:
+    sidebar_wait.empty()
+    skeleton.empty()
+if "data ready" not in startup:
+    startup["data ready"] = time.perf_counter() - _T0
+    log.info("startup profile: %s", ", ".join(f"{k} {v:.2f}s" for k, v in startup.items()))
 
-df_filt = df[mask] 
+# already imported by the loader threads, so these are dictionary lookups now
+import pandas as pd
+import plotly.express as px
+
+from data_prep import METRIC_COLUMNS
+from export import DATASETS, FORMATS, run_export
+import timeseries
+
+
+@st.cache_data
+def load_filter_options():
+    # Value domains for every sidebar filter, computed once per dataset so the
+    # sidebar never has to scan the frame on a rerun.
+    return get_backend().filter_options()
+
+
+@st.cache_data
+def load_state_ids():
+    # dataset state → map feature id, resolved once rather than re-normalised per rerun
+    return geo.build_state_index(load_filter_options()["state"], load_geojson()).ids
 
-# ─── Tabs Setup ───────────────────────────────────────────────────────────────
-tabs = st.tabs([
-    "WASH+ Infrastructure",
-    "Equity & Accessibility",
-    "Digital & ICT",
-])
+# ─── Sidebar Filters ─────────────────────────────────────────────────────────
+opts = load_filter_options()
+state_sel    = st.sidebar.multiselect("State",  opts["state"], default=opts["state"])
+district_sel = st.sidebar.multiselect("District", sorted({d for s in state_sel for d in opts["districts"].get(s, [])}))
+loc_sel      = st.sidebar.multiselect("Location", opts["location"], default=opts["location"])
+mgmt_sel     = st.sidebar.multiselect("Management", opts["management"], default=opts["management"])
+cat_sel      = st.sidebar.multiselect("Category", opts["category"], default=opts["category"])
+minority_sel = st.sidebar.multiselect("Minority-managed", opts["minority"], default=opts["minority"])
+resi_sel     = st.sidebar.multiselect("Residential", opts["residential"], default=opts["residential"])
+cwsn_sel     = st.sidebar.multiselect("CWSN-only", opts["special_cwsn"], default=opts["special_cwsn"])
+
+filters = {
+    "state":        state_sel,
+    "district":     district_sel or None,
+    "location":     loc_sel,
+    "management":   mgmt_sel,
+    "category":     cat_sel,
+    "minority":     minority_sel,
+    "residential":  resi_sel,
+    "special_cwsn": cwsn_sel,
+}
+
+with st.sidebar.expander("Data quality"):
+    dq = get_quality_report()
+    if dq is None:
+        st.caption("No data-quality report for this dataset.")
+    else:
+        st.caption(
+            f"{dq.rows_profile:,} profile / {dq.rows_facility:,} facility rows read · "
+            f"{dq.rows_loaded:,} loaded · {dq.rows_rejected:,} rejected"
+        )
+        st.dataframe(dq.summary()[["check", "column", "severity", "rows"]], hide_index=True)
+        if dq.unmatched_states:
+            st.warning("Not on the map: " + ", ".join(dq.unmatched_states))
+
+with st.sidebar.expander("Startup profile"):
+    st.dataframe(
+        pd.Series(startup, name="seconds").rename_axis("phase").reset_index(),
+        hide_index=True,
+    )
 
+# ─── Export ──────────────────────────────────────────────────────────────────
+@st.cache_resource
+def get_export_pool():
+    # exports run off the script thread so a national extract never blocks a rerun
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="udise-export")
+
+
+@st.fragment(run_every=2)
+def export_progress():
+    # only rendered while a job is pending; once it finishes a full rerun shows
+    # the result and this poller is no longer drawn, so polling stops
+    job = st.session_state.get("export_job")
+    if job is not None and job.done():
+        st.rerun()
+    st.info("Export running…")
+
+
+def _read_export(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+EXPORT_DOWNLOAD_LIMIT_MB = 200   # bigger extracts stay on disk at the path shown
+
+with st.sidebar.expander("Export data"):
+    export_what = st.selectbox("Dataset", list(DATASETS), key="export_dataset")
+    export_fmt  = st.radio("Format", FORMATS, horizontal=True, key="export_format")
+    if st.button("Run export", key="export_run"):
+        st.session_state.pop("export_result", None)
+        st.session_state["export_job"] = get_export_pool().submit(
+            run_export, backend, export_what, filters, export_fmt,
+        )
+
+    job = st.session_state.get("export_job")
+    if job is not None and job.done():
+        del st.session_state["export_job"]
+        try:
+            st.session_state["export_result"] = job.result()
+        except Exception as e:
+            st.session_state["export_result"] = e
+
+    result = st.session_state.get("export_result")
+    if "export_job" in st.session_state:
+        export_progress()
+    elif isinstance(result, Exception):
+        st.error(f"Export failed: {result}")
+    elif result is not None and os.path.exists(result[0]):
+        path, rows = result
+        size_mb = os.path.getsize(path) / 1024**2
+        st.caption(f"{rows:,} rows → `{path}` ({size_mb:.1f} MB)")
+        if size_mb <= EXPORT_DOWNLOAD_LIMIT_MB:
+            # deferred: the file is read only when the button is clicked, not on every rerun
+            st.download_button("Download", partial(_read_export, path),
+                               file_name=os.path.basename(path), key="export_download")
+
+# ─── Shared Aggregations ─────────────────────────────────────────────────────
+# Every tab reads from the same per-rerun aggregates: one pass per grouping over
+# all registry metrics, cached on the filters so switching metric or tab is free.
+@st.cache_data(max_entries=64, show_spinner=False)
+def aggregate(by, filters, backend_name):
+    if by is None:
+        return get_backend().means(METRIC_COLUMNS, filters)
+    return get_backend().means_by(by, METRIC_COLUMNS, filters)
+
+
+
+overall   = aggregate(None, filters, backend.name)
+by_state  = aggregate("state", filters, backend.name)
+by_map_id = aggregate("state_id", filters, backend.name)   # choropleth joins on feature ids
+by_mgmt   = aggregate("management", filters, backend.name)
+by_loc    = aggregate("location", filters, backend.name)
+
+# ─── Panels ───────────────────────────────────────────────────────────────────
 def summary(series, label):
     top, bot = series.idxmax(), series.idxmin()
     return f"**{top}** at {series.max():.0%} {label}, **{bot}** at {series.min():.0%} (avg {series.mean():.0%})."
 
-# ─── Tab 1: Infrastructure & Facilities ──────────────────────────────────────
-with tabs[0]:
-    st.header("WASH+ Infrastructure")
 
-    metrics = {
-        "Functional Electricity":  "func_electricity",
-        "Functional Water":        "func_water",
-        "Girls’ Toilets (%)":      "pct_toilet_func_girls",
-        "Functional Handwash":     "func_handwash",
-    }
+def kpi_donuts(tab):
+    cols = st.columns(len(tab.kpis), gap="small")
 
-    #Pie charts
-    cols = st.columns(len(metrics), gap="small")
-
-    for (label, colname), col in zip(metrics.items(), cols):
-        val = df_filt[colname].mean()   # compute mean here
-        frac = float(val)
+    for key, col in zip(tab.kpis, cols):
+        label = METRICS[key].label
+        frac = float(overall[key])
         pct_text = f"{frac*100:.0f}%" 
         fig = px.pie(
             names=["Available","Not available"],
@@ -199,35 +337,16 @@ with tabs[0]:
             f"<div style='text-align: center; font-weight: 600;'>{label}</div>",
             unsafe_allow_html=True
         )
-        col.plotly_chart(fig, use_container_width=True,)
-
-    # ————— Metric selector —————
-    metrics = {
-        "Functional Electricity":  "func_electricity",
-        "Functional Water":        "func_water",
-        "Girls’ Toilets (%)":      "pct_toilet_func_girls",
-        "Functional Handwash":     "func_handwash",
-        "Composite Infra Index":   "infra_index",
-    }
-    
-    choice = st.selectbox("Choose a metric to map", list(metrics.keys()))
-    col = metrics[choice]
-    
+        col.plotly_chart(fig, width="stretch", key=f"{tab.key}_donut_{key}")
+
+
+def state_panels(tab, col, choice):
     # ─── Two‐column layout ───
     left, right = st.columns([2.5, 2], gap="large")
 
-    # Choropleth
-    with open("india_states.geojson") as f:
-        gj = json.load(f)
-
-    # ————— Aggregate by state —————
-    state_metric = (
-        df_filt
-        .groupby("state")[col]
-        .mean()
-        .reset_index()
-    )
-    state_metric["state"] = state_metric["state"].str.title()
+    gj = load_geojson()
+    state_metric = by_map_id[col].drop(geo.UNMATCHED_ID, errors="ignore").reset_index()
+    state_metric["state"] = state_metric["state_id"].map(feature_names(gj))
 
     # ————— Build the choropleth —————
     with left:
@@ -235,8 +354,8 @@ with tabs[0]:
         fig = px.choropleth(
             state_metric,
             geojson=gj,
-            locations="state",
-            featureidkey="properties.ST_NM",
+            locations="state_id",
+            hover_name="state",
             color=col,
             range_color=(0,1),
             color_continuous_scale=[PRIMARY, SECONDARY],
@@ -264,24 +383,16 @@ with tabs[0]:
         # let Streamlit stretch the map to fill the column
         st.plotly_chart(
             fig,
-            use_container_width=False,
+            width="content",
             config={"displayModeBar":False, "scrollZoom":False},
-            key="choropleth_map",
-        )
-
-    # 1) Compute state‐level means for the chosen metric
-        ranked = (
-            df_filt
-            .groupby("state")[col]
-            .mean()
-            .sort_values(ascending=False)
+            key=f"{tab.key}_choropleth",
         )
 
-    # 2) Grab top 10 and bottom 10
+    # Top 10 and bottom 10 states for the chosen metric
+    ranked = by_state[col].sort_values(ascending=False)
     tb = pd.concat([ranked.head(10), ranked.tail(10)]).reset_index()
     tb.columns = ["state", col]      # ensure nice names
 
-    # 3) Build the horizontal bar
     with right:
         st.subheader(f"State Ranking by {choice}")
         fig2 = px.bar(
@@ -291,34 +402,25 @@ with tabs[0]:
             orientation="h",
             labels={col: choice, "state": "State"},
         )
-
-        # 4) Style it
         fig2.update_traces(marker_color=PRIMARY)
         fig2.update_layout(
         margin=dict(l=0, r=0, t=30, b=0),
     )
         st.plotly_chart(
             fig2,
-            use_container_width=False,
             width=600,    # slightly wider than the map
             height=400,
             config={"displayModeBar": False},
-            key="ranking",
+            key=f"{tab.key}_ranking",
         )
-    
+
+
+def breakdown_panels(tab, col, choice):
     col_mgmt, col_loc = st.columns(2)
 
     with col_mgmt:
         st.subheader(f"{choice} by Management")
-        # aggregate
-        mgmt_summary = (
-            df_filt
-            .groupby("management")[col]  # `col` is your internal column name for the metric
-            .mean()
-            .reset_index()
-            .sort_values(col, ascending=False)
-        )
-        # bar chart
+        mgmt_summary = by_mgmt[[col]].reset_index().sort_values(col, ascending=False)
         fig_mgmt = px.bar(
             mgmt_summary,
             x="management",
@@ -334,20 +436,11 @@ with tabs[0]:
             height=350,
             xaxis_tickangle=0,
         )
-        st.plotly_chart(fig_mgmt, use_container_width=True, config={"displayModeBar": False}, key = "wash_mgmt")
-
+        st.plotly_chart(fig_mgmt, width="stretch", config={"displayModeBar": False}, key=f"{tab.key}_mgmt")
 
     with col_loc:
         st.subheader(f"{choice} by Location")
-        # aggregate
-        loc_summary = (
-            df_filt
-            .groupby("location")[col]    # assumes your df_filt has "location" = "Rural"/"Urban"
-            .mean()
-            .reset_index()
-            .sort_values(col, ascending=False)
-        )
-        # bar chart
+        loc_summary = by_loc[[col]].reset_index().sort_values(col, ascending=False)
         fig_loc = px.bar(
             loc_summary,
             x="location",
@@ -361,454 +454,86 @@ with tabs[0]:
             height=350,
             showlegend=False,
         )
-        st.plotly_chart(fig_loc, use_container_width=True, config={"displayModeBar": False}, key = "wash_loc")
-    
-# ─── Tab 2: Equity & CWSN ──────────────────────────────────────
-with tabs[1]:
-    st.header("Equity & Accessibility")
-
-    metrics = {
-        "Ramps":  "ramps",
-        "Handrails":        "handrails",
-        "Girls’ Toilets (%)":      "pct_toilet_func_girls",
-    }
-
-    #Pie charts
-    cols = st.columns(len(metrics), gap="small")
-
-    for (label, colname), col in zip(metrics.items(), cols):
-        val = df_filt[colname].mean()   # compute mean here
-        frac = float(val)
-        pct_text = f"{frac*100:.0f}%" 
-        fig_e = px.pie(
-            names=["Available","Not available"],
-            values=[frac, 1 - frac],
-            hole=0.6,
-            )
-        # Style it to look like a KPI
-        fig_e.update_traces(
-            marker_colors=[PRIMARY, "#e0e0e0"],
-            textinfo="none"
-        )
-        fig_e.update_layout(
-            margin=dict(l=0, r=0, t=0, b=0),
-            showlegend=False,
-            width=100, height=100,  # adjust as you like
-            annotations=[          # <-- put the percent in the center
-                dict(
-                    text=pct_text,
-                    x=0.5, y=0.5, 
-                    font_size=20,
-                    font_color=PRIMARY,
-                    showarrow=False
-                )
-            ]
-        )
-
-        # Render with the column header as label
-        col.markdown(
-            f"<div style='text-align: center; font-weight: 600;'>{label}</div>",
-            unsafe_allow_html=True
-        )
-        eq_donut_key = "eq_donut_" + label.lower().replace(" ", "_").replace("’","")
-
-        col.plotly_chart(fig_e, use_container_width=True, key=eq_donut_key)
-
-    # ————— Metric selector —————
-    
-    metrics = {
-        "Ramps":  "ramps",
-        "Handrails":        "handrails",
-        "Girls’ Toilets (%)":      "pct_toilet_func_girls",
-        "Composite Equity Index": "equity_index",
-    }
-
-    choice = st.selectbox("Choose a metric to map", list(metrics.keys()))
-    col = metrics[choice]
-    
-    # ─── Two‐column layout ───
-    left, right = st.columns([2.5, 2], gap="large")
-
-    # Choropleth
-    with open("india_states.geojson") as f:
-        gj = json.load(f)
-
-    # ————— Aggregate by state —————
-    state_metric = (
-        df_filt
-        .groupby("state")[col]
-        .mean()
-        .reset_index()
-    )
-    state_metric["state"] = state_metric["state"].str.title()
-
-    # ————— Build the choropleth —————
-    with left:
-        st.subheader(f"Composite Map for {choice}")
-        fig_e2 = px.choropleth(
-            state_metric,
-            geojson=gj,
-            locations="state",
-            featureidkey="properties.ST_NM",
-            color=col,
-            range_color=(0,1),
-            color_continuous_scale=[PRIMARY, SECONDARY],
-            labels={col: ""},
-            scope="asia",
-            projection="mercator",
-        )
-
-        # hide geo frame & zoom handles
-        #fig.update_geos(fitbounds="locations", visible=False)
-        fig_e2.update_geos(
-            visible=False,
-            center=dict(lat=22.0, lon=80.0),    # approximate center of India
-            projection_scale=2.5,               # try 5–8 until it fills nicely
-        )
-        fig_e2.update_traces(showscale=True)
-
-        # only set margins & title—no width/height
-        fig_e2.update_layout(
-            #autosize = True,
-            margin=dict(l=0, r=0, t=30, b=0),
-            #title=dict(text=choice, x=0.5),
-        )
-
-        # let Streamlit stretch the map to fill the column
-        st.plotly_chart(
-            fig_e2,
-            use_container_width=False,
-            config={"displayModeBar":False, "scrollZoom":False},
-            key="choropleth_map_eq",
-        )
-
-    # 1) Compute state‐level means for the chosen metric
-        ranked = (
-            df_filt
-            .groupby("state")[col]
-            .mean()
-            .sort_values(ascending=False)
-        )
-
-    # 2) Grab top 10 and bottom 10
-    tb = pd.concat([ranked.head(10), ranked.tail(10)]).reset_index()
-    tb.columns = ["state", col]      # ensure nice names
-
-    # 3) Build the horizontal bar
-    with right:
-        st.subheader(f"State Ranking by {choice}")
-        fig_e3 = px.bar(
-            tb,
-            x=col,
-            y="state",
-            orientation="h",
-            labels={col: choice, "state": "State"},
-        )
-
-        # 4) Style it
-        fig_e3.update_traces(marker_color=PRIMARY)
-        fig_e3.update_layout(
-        margin=dict(l=0, r=0, t=30, b=0),
-    )
-        st.plotly_chart(
-            fig_e3,
-            use_container_width=False,
-            width=600,    # slightly wider than the map
-            height=400,
-            config={"displayModeBar": False},
-            key="ranking_eq",
-        )
-    
-    col_mgmt, col_loc = st.columns(2)
-
-    with col_mgmt:
-        st.subheader(f"{choice} by Management")
-        # aggregate
-        mgmt_summary = (
-            df_filt
-            .groupby("management")[col]  # `col` is your internal column name for the metric
-            .mean()
-            .reset_index()
-            .sort_values(col, ascending=False)
-        )
-        # bar chart
-        fig_e_mgmt = px.bar(
-            mgmt_summary,
-            x="management",
-            y=col,
-            labels={ "management": "Management", col: choice },
-            color="management",
-            color_discrete_sequence=[PRIMARY, SECONDARY, ACCENT]
-        )
-
-        fig_e_mgmt.update_layout(
-            showlegend=False,
-            margin=dict(l=0, r=0, t=30, b=0),
-            height=350,
-            xaxis_tickangle=0,
-        )
-        st.plotly_chart(fig_e_mgmt, use_container_width=True, config={"displayModeBar": False}, key = "eq_mgmt")
-
-
-    with col_loc:
-        st.subheader(f"{choice} by Location")
-        # aggregate
-        loc_summary = (
-            df_filt
-            .groupby("location")[col]    # assumes your df_filt has "location" = "Rural"/"Urban"
-            .mean()
-            .reset_index()
-            .sort_values(col, ascending=False)
-        )
-        # bar chart
-        fig_e_loc = px.bar(
-            loc_summary,
-            x="location",
-            y=col,
-            labels={ "location": "Location", col: choice },
-            color="location",
-            color_discrete_map={"Urban": PRIMARY, "Rural": SECONDARY},
-        )
-        fig_e_loc.update_layout(
-            margin=dict(l=0, r=0, t=30, b=0),
-            height=350,
-            showlegend=False,
-        )
-        st.plotly_chart(fig_e_loc, use_container_width=True, config={"displayModeBar": False}, key = "eq_loc")
-    
-    dig_s = pd.Series({
-        "Internet":  df_filt["internet"].mean(),
-        "ICT Labs":  df_filt["ict_lab"].mean(),
-        "Computers": df_filt["desktop"].mean(),
-    })
-
-    d1, d2, d3 = st.columns(3)
-    d1.metric("Internet (avail %)", f"{dig_s['Internet']:.0%}")
-    d2.metric("ICT Labs (avail %)", f"{dig_s['ICT Labs']:.0%}")
-    d3.metric("Avg PCs/School", f"{dig_s['Computers']:.1f}")
-
-# ─── Tab 3: Digital & ICT ───────────────────────────────────────────────────
-with tabs[2]:
-    st.header("Digital & ICT Readiness")
-
-    metrics = {
-        "Internet":  "internet",
-        "ICT Labs":   "ict_lab",
-        "Computers":  "computer_yn",
-    }
+        st.plotly_chart(fig_loc, width="stretch", config={"displayModeBar": False}, key=f"{tab.key}_loc")
 
-    #Pie charts
-    cols = st.columns(len(metrics), gap="small")
 
-    for (label, colname), col in zip(metrics.items(), cols):
-        val = df_filt[colname].mean()   # compute mean here
-        frac = float(val)
-        pct_text = f"{frac*100:.0f}%" 
-        fig_e = px.pie(
-            names=["Available","Not available"],
-            values=[frac, 1 - frac],
-            hole=0.6,
-            )
-        # Style it to look like a KPI
-        fig_e.update_traces(
-            marker_colors=[PRIMARY, "#e0e0e0"],
-            textinfo="none"
-        )
-        fig_e.update_layout(
-            margin=dict(l=0, r=0, t=0, b=0),
-            showlegend=False,
-            width=100, height=100,  # adjust as you like
-            annotations=[          # <-- put the percent in the center
-                dict(
-                    text=pct_text,
-                    x=0.5, y=0.5, 
-                    font_size=20,
-                    font_color=PRIMARY,
-                    showarrow=False
-                )
-            ]
-        )
+def headline_stats(tab):
+    for (label, key), slot in zip(tab.stats.items(), st.columns(len(tab.stats))):
+        slot.metric(label, format(overall[key], METRICS[key].fmt))
 
-        # Render with the column header as label
-        col.markdown(
-            f"<div style='text-align: center; font-weight: 600;'>{label}</div>",
-            unsafe_allow_html=True
-        )
-        dig_donut_key = "dig_donut_" + label.lower().replace(" ", "_").replace("’","")
 
-        col.plotly_chart(fig_e, use_container_width=True, key=dig_donut_key)
+@st.cache_data
+def load_trend_aggregates(mtime):
+    # keyed on the file's mtime: a rebuilt or newly ingested store is picked up, a missing one is retried
+    return timeseries.load_aggregates()
 
-    dig_s = pd.Series({
-        "Internet":  df_filt["internet"].mean(),
-        "ICT Labs":  df_filt["ict_lab"].mean(),
-        "Computers": df_filt["desktop"].mean(),
-    })
 
-    # d1, d2, d3 = st.columns(3)
-    # d1.metric("Internet (avail %)", f"{dig_s['Internet']:.0%}")
-    # d2.metric("ICT Labs (avail %)", f"{dig_s['ICT Labs']:.0%}")
-    # d3.metric("Avg PCs/School", f"{dig_s['Computers']:.1f}")
+def trend_aggregates_mtime():
+    path = timeseries.aggregates_path()
+    return os.path.getmtime(path) if os.path.exists(path) else None
 
 
-    # ————— Metric selector —————
-    
-    metrics = {
-        "Internet":  "internet",
-        "ICT Labs":   "ict_lab",
-        "Computers":  "computer_yn",
-    }
+def trends_tab(agg):
+    st.header("Trends across UDISE+ years")
+    st.caption("Built from the multi-year store (`python timeseries.py build`); only the State filter applies.")
 
-    choice = st.selectbox("Choose a metric to map", list(metrics.keys()))
+    metrics = {METRICS[key].label: key for key in METRIC_COLUMNS}
+    choice = st.selectbox("Choose a metric", list(metrics.keys()), key="trend_metric")
     col = metrics[choice]
-    
-    # ─── Two‐column layout ───
-    left, right = st.columns([2.5, 2], gap="large")
 
-    # Choropleth
-    with open("india_states.geojson") as f:
-        gj = json.load(f)
+    state_ids = load_state_ids()
+    ids = sorted({state_ids[s] for s in state_sel} - {geo.UNMATCHED_ID})
+    overall_trend = timeseries.trend(agg, col, ids)
+    per_state = timeseries.trend(agg, col, ids, by_state=True)
+    if overall_trend.empty:
+        st.info("No stored years for the selected states.")
+        return
 
-    # ————— Aggregate by state —————
-    state_metric = (
-        df_filt
-        .groupby("state")[col]
-        .mean()
-        .reset_index()
-    )
-    state_metric["state"] = state_metric["state"].str.title()
+    latest = overall_trend.iloc[-1]
+    delta_fmt = "+.1%" if METRICS[col].fmt.endswith("%") else "+.2f"
+    delta = None if pd.isna(latest["yoy"]) else format(latest["yoy"], delta_fmt)
+    st.metric(f"{choice}, {int(latest['year'])}", format(latest[col], METRICS[col].fmt), delta)
 
-    # ————— Build the choropleth —————
+    left, right = st.columns([2.5, 2], gap="large")
     with left:
-        st.subheader(f"Composite Map for {choice}")
-        fig_e2 = px.choropleth(
-            state_metric,
-            geojson=gj,
-            locations="state",
-            featureidkey="properties.ST_NM",
-            color=col,
-            range_color=(0,1),
-            color_continuous_scale=[PRIMARY, SECONDARY],
-            labels={col: ""},
-            scope="asia",
-            projection="mercator",
-        )
-
-        # hide geo frame & zoom handles
-        #fig.update_geos(fitbounds="locations", visible=False)
-        fig_e2.update_geos(
-            visible=False,
-            center=dict(lat=22.0, lon=80.0),    # approximate center of India
-            projection_scale=2.5,               # try 5–8 until it fills nicely
-        )
-        fig_e2.update_traces(showscale=True)
-
-        # only set margins & title—no width/height
-        fig_e2.update_layout(
-            #autosize = True,
-            margin=dict(l=0, r=0, t=30, b=0),
-            #title=dict(text=choice, x=0.5),
-        )
-
-        # let Streamlit stretch the map to fill the column
-        st.plotly_chart(
-            fig_e2,
-            use_container_width=False,
-            config={"displayModeBar":False, "scrollZoom":False},
-            key="choropleth_map_dig",
-        )
-
-    # 1) Compute state‐level means for the chosen metric
-        ranked = (
-            df_filt
-            .groupby("state")[col]
-            .mean()
-            .sort_values(ascending=False)
-        )
+        st.subheader(f"{choice} by Year")
+        fig = px.line(per_state, x="year", y=col, color="state", markers=True,
+                      labels={col: choice, "year": "Year", "state": "State"})
+        fig.add_scatter(x=overall_trend["year"], y=overall_trend[col], name="Selected states",
+                        line=dict(color=PRIMARY, width=4))
+        fig.update_layout(margin=dict(l=0, r=0, t=30, b=0), height=400)
+        fig.update_xaxes(dtick=1)
+        st.plotly_chart(fig, width="stretch", config={"displayModeBar": False}, key="trend_line")
 
-    # 2) Grab top 10 and bottom 10
-    tb = pd.concat([ranked.head(10), ranked.tail(10)]).reset_index()
-    tb.columns = ["state", col]      # ensure nice names
-
-    # 3) Build the horizontal bar
     with right:
-        st.subheader(f"State Ranking by {choice}")
-        fig_e3 = px.bar(
-            tb,
-            x=col,
-            y="state",
-            orientation="h",
-            labels={col: choice, "state": "State"},
-        )
+        st.subheader(f"Year-over-Year Change, {int(latest['year'])}")
+        last = per_state[per_state["year"] == latest["year"]].dropna(subset=["yoy"])
+        fig2 = px.bar(last.sort_values("yoy"), x="yoy", y="state", orientation="h",
+                      labels={"yoy": f"Δ {choice}", "state": "State"})
+        fig2.update_traces(marker_color=PRIMARY)
+        fig2.update_layout(margin=dict(l=0, r=0, t=30, b=0), height=400)
+        st.plotly_chart(fig2, width="stretch", config={"displayModeBar": False}, key="trend_yoy")
 
-        # 4) Style it
-        fig_e3.update_traces(marker_color=PRIMARY)
-        fig_e3.update_layout(
-        margin=dict(l=0, r=0, t=30, b=0),
-    )
-        st.plotly_chart(
-            fig_e3,
-            use_container_width=False,
-            width=600,    # slightly wider than the map
-            height=400,
-            config={"displayModeBar": False},
-            key="ranking_dig",
-        )
-    
-    col_mgmt, col_loc = st.columns(2)
 
-    with col_mgmt:
-        st.subheader(f"{choice} by Management")
-        # aggregate
-        mgmt_summary = (
-            df_filt
-            .groupby("management")[col]  # `col` is your internal column name for the metric
-            .mean()
-            .reset_index()
-            .sort_values(col, ascending=False)
-        )
-        # bar chart
-        fig_e_mgmt = px.bar(
-            mgmt_summary,
-            x="management",
-            y=col,
-            labels={ "management": "Management", col: choice },
-            color="management",
-            color_discrete_sequence=[PRIMARY, SECONDARY, ACCENT]
-        )
+# ─── Tabs ─────────────────────────────────────────────────────────────────────
+trend_agg = load_trend_aggregates(trend_aggregates_mtime())
+containers = st.tabs([t.title for t in TABS] + ([] if trend_agg is None else ["Trends"]))
 
-        fig_e_mgmt.update_layout(
-            showlegend=False,
-            margin=dict(l=0, r=0, t=30, b=0),
-            height=350,
-            xaxis_tickangle=0,
-        )
-        st.plotly_chart(fig_e_mgmt, use_container_width=True, config={"displayModeBar": False}, key = "dig_mgmt")
+if trend_agg is not None:
+    with containers[-1]:
+        trends_tab(trend_agg)
 
+for tab, container in zip(TABS, containers):
+    with container:
+        st.header(tab.header)
+        kpi_donuts(tab)
 
-    with col_loc:
-        st.subheader(f"{choice} by Location")
-        # aggregate
-        loc_summary = (
-            df_filt
-            .groupby("location")[col]    # assumes your df_filt has "location" = "Rural"/"Urban"
-            .mean()
-            .reset_index()
-            .sort_values(col, ascending=False)
-        )
-        # bar chart
-        fig_e_loc = px.bar(
-            loc_summary,
-            x="location",
-            y=col,
-            labels={ "location": "Location", col: choice },
-            color="location",
-            color_discrete_map={"Urban": PRIMARY, "Rural": SECONDARY},
-        )
-        fig_e_loc.update_layout(
-            margin=dict(l=0, r=0, t=30, b=0),
-            height=350,
-            showlegend=False,
-        )
-        st.plotly_chart(fig_e_loc, use_container_width=True, config={"displayModeBar": False}, key = "dig_loc")
-    
+        # ————— Metric selector —————
+        metrics = {METRICS[key].label: key for key in tab.selectable}
+        choice = st.selectbox("Choose a metric to map", list(metrics.keys()), key=f"{tab.key}_metric")
+        col = metrics[choice]
 
+        state_panels(tab, col, choice)
+        breakdown_panels(tab, col, choice)
+        if tab.stats:
+            headline_stats(tab)
@@ -0,0 +1,137 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from geo import GEOJSON_PATH, UNMATCHED_ID, build_state_index, load_geojson
+from metrics import TAB_METRIC_KEYS, derive_columns
+from validate import (ON_ERROR, DataQualityReport, apply_policy, code_checks, count_checks,
+                      key_checks, ratio_checks, reject_mask)
+
+# Paths to the raw UDISE+ extracts, relative to the project root
+PROF_FILE_PATH = os.path.join("data", "100_prof1.csv")
+FAC_FILE_PATH  = os.path.join("data", "100_fac.csv")
+
+# code → label decodings for the profile variables (also the filter domains)
+CODE_LABELS = {
+    "location":     {1:"Rural",2:"Urban"},
+    "management":   {1:"Government",2:"Government Aided",3:"Private"},
+    "category":     {1:"Primary",2:"Upper Primary",3:"Secondary",4:"Higher Secondary"},
+    "minority":     {1:"Yes",2:"No"},
+    "residential":  {1:"Completely",2:"Partially",3:"Non-residential"},
+    "special_cwsn": {1:"Yes",2:"No"},
+}
+
+# Sidebar filter dimensions, in the order the sidebar shows them
+FILTER_COLUMNS = ["state", "district", *CODE_LABELS]
+
+# Every metric column the dashboard tabs aggregate
+METRIC_COLUMNS = TAB_METRIC_KEYS
+
+# Raw column names → dashboard variable names
+PROFILE_RENAMES = {
+    "managment":              "management",
+    "rural_urban":            "location",
+    "school_category":        "category",
+    "minority_school":        "minority",
+    "resi_school":            "residential",
+    "special_school_for_cwsn":"special_cwsn"
+}
+FACILITY_RENAMES = {
+    "availability_ramps":        "ramps",
+    "availability_of_handrails": "handrails",
+    "comp_ict_lab_yn":           "ict_lab"
+}
+COUNT_COLUMNS = ["total_girls_func_toilet", "total_girls_toilet", "desktop"]
+
+CHUNKSIZE = 250_000
+
+
+def prepare_data(prof_path=PROF_FILE_PATH, fac_path=FAC_FILE_PATH):
+    """Read, validate, merge and feature-engineer the profile and facility extracts."""
+    return load_dataset(prof_path, fac_path)[0]
+
+
+def load_dataset(prof_path=PROF_FILE_PATH, fac_path=FAC_FILE_PATH,
+                 on_error="quarantine", chunksize=CHUNKSIZE, geojson_path=GEOJSON_PATH):
+    """Stream both extracts once, validating each chunk as it is read.
+
+    Returns the prepared frame and its DataQualityReport. `on_error` decides
+    what happens to rows failing a reject check: "quarantine" (drop, keep a
+    sample in the report), "drop", or "keep".
+    """
+    if on_error not in ON_ERROR:
+        raise ValueError(f"on_error must be one of {ON_ERROR}, got {on_error!r}")
+    report = DataQualityReport()
+
+    # 1. Facility extract: renamed and validated chunk by chunk
+    fac_parts, seen = [], set()
+    for chunk in pd.read_csv(fac_path, chunksize=chunksize):
+        chunk = chunk.rename(columns=FACILITY_RENAMES)
+        report.rows_facility += len(chunk)
+        bad, reasons = reject_mask(chunk, report, [
+            *key_checks(chunk, seen, required=(), optional=()),
+            *count_checks(chunk, COUNT_COLUMNS),
+            *ratio_checks(chunk, "total_girls_func_toilet", "total_girls_toilet"),
+        ])
+        fac_parts.append(apply_policy(chunk, bad, reasons, report, on_error))
+    fac = pd.concat(fac_parts, ignore_index=True)
+    fac_keys = pd.Index(fac["pseudocode"].unique())
+    fac_matched = np.zeros(len(fac_keys), dtype=bool)
+
+    # 2. Profile extract: renamed, validated, merged and engineered chunk by chunk
+    parts, seen = [], set()
+    for chunk in pd.read_csv(prof_path, chunksize=chunksize):
+        chunk = chunk.rename(columns=PROFILE_RENAMES)
+        report.rows_profile += len(chunk)
+        pos = fac_keys.get_indexer(chunk["pseudocode"])
+        bad, reasons = reject_mask(chunk, report, [
+            *key_checks(chunk, seen),
+            *code_checks(chunk, CODE_LABELS),
+            ("unmatched_profile", "pseudocode", pos < 0),
+        ])
+        # only facility rows whose profile row survives the policy end up merged
+        kept = pos if on_error == "keep" else pos[~bad]
+        fac_matched[kept[kept >= 0]] = True
+        chunk = apply_policy(chunk, bad, reasons, report, on_error)
+        parts.append(_engineer(chunk.merge(fac, on="pseudocode", how="inner")))
+
+    report.count("unmatched_facility", "pseudocode", ~fac_matched)
+    df = pd.concat(parts, ignore_index=True)
+
+    # 3. Resolve state names to map feature ids once, so the choropleth joins on integers
+    index = build_state_index(df["state"].unique(), load_geojson(geojson_path))
+    df["state_id"] = df["state"].map(index.ids).fillna(UNMATCHED_ID).astype("int16")
+    report.count("unmatched_state", "state", df["state_id"].to_numpy() == UNMATCHED_ID)
+    report.unmatched_states = index.unmatched
+
+    report.rows_loaded = len(df)
+    return df, report
+
+
+def _engineer(df):
+    # Derived flags & indices come from the metric registry (row-wise, so safe per chunk);
+    # zero girls'-toilet denominators are counted by the validator (zero_denominator).
+    derive_columns(df)
+
+    # Decode all the code‐variables into human labels
+    for colname, labels in CODE_LABELS.items():
+        df[colname] = df[colname].map(labels)
+
+    return df
+
+
+def filter_options(df):
+    """Value domains for every sidebar filter plus a state → districts lookup."""
+    districts = df.dropna(subset=["district"]).groupby("state")["district"].unique()
+    return {
+        "state":     sorted(df.state.dropna().unique()),
+        "districts": {state: sorted(d) for state, d in districts.items()},
+        # coded dimensions keep their code order (Rural, Urban / Primary → Higher Secondary)
+        **{colname: list(labels.values()) for colname, labels in CODE_LABELS.items()},
+    }
+
+
+def default_filters(opts):
+    """The dashboard's opening filters: every labelled value selected, no district filter."""
+    return {c: (None if c == "district" else opts[c]) for c in FILTER_COLUMNS}
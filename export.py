@@ -0,0 +1,101 @@
+"""Chunked export of the numbers behind the dashboard.
+
+School-level rows are streamed from the backend in chunks and appended to the
+output file one chunk at a time, so a national extract never builds a second
+full copy of the dataset in memory. Aggregate tables are small and written in
+one go. Files are written under a temporary name and renamed when complete;
+exports older than a day are pruned whenever a new one starts.
+"""
+import os
+import time
+import uuid
+
+from data_prep import METRIC_COLUMNS
+
+EXPORT_DIR = "exports"
+FORMATS    = ("csv", "parquet")
+MAX_AGE_S  = 24 * 3600   # finished exports (and abandoned .part files) older than this are pruned
+
+# dataset label → group-by column (None = school-level rows)
+DATASETS = {
+    "School-level rows": None,
+    "By state":          "state",
+    "By district":       "district",
+    "By management":     "management",
+    "By location":       "location",
+}
+
+
+def export_path(dataset, fmt, export_dir=EXPORT_DIR):
+    # the export pool is shared by every session, so the name must be unique, not just timestamped
+    slug = dataset.lower().replace(" ", "_").replace("-", "_")
+    stamp = f"{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+    return os.path.join(export_dir, f"udise_{slug}_{stamp}.{fmt}")
+
+
+def prune_exports(export_dir=EXPORT_DIR, max_age=MAX_AGE_S):
+    """Delete export files older than `max_age` seconds; returns how many were removed."""
+    cutoff, removed = time.time() - max_age, 0
+    for entry in os.scandir(export_dir):
+        if entry.is_file() and entry.name.startswith("udise_") and entry.stat().st_mtime < cutoff:
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except OSError:
+                pass
+    return removed
+
+
+def export_rows(backend, filters, path, fmt="csv", columns=None, chunksize=100_000):
+    """Stream the filtered school rows to `path`; returns the number of rows written."""
+    return _write_chunks(backend.iter_rows(filters, columns, chunksize), path, fmt)
+
+
+def export_aggregate(backend, by, filters, path, fmt="csv", cols=METRIC_COLUMNS):
+    """Write the per-`by` means of `cols` plus a school count; returns the number of groups."""
+    table = backend.means_by(by, cols, filters)
+    table.insert(0, "schools", backend.count_by(by, filters).reindex(table.index).fillna(0).astype(int))
+    return _write_chunks([table.reset_index()], path, fmt)
+
+
+def run_export(backend, dataset, filters, fmt="csv", export_dir=EXPORT_DIR):
+    """Export one of DATASETS for the current filters; returns (path, rows)."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {FORMATS}")
+    os.makedirs(export_dir, exist_ok=True)
+    prune_exports(export_dir)
+    path = export_path(dataset, fmt, export_dir)
+    by = DATASETS[dataset]
+    if by is None:
+        rows = export_rows(backend, filters, path, fmt)
+    else:
+        rows = export_aggregate(backend, by, filters, path, fmt)
+    return path, rows
+
+
+def _write_chunks(chunks, path, fmt):
+    # the backends always yield at least one (possibly empty) chunk, so even an
+    # export matching nothing gets a CSV header / Parquet schema
+    tmp = path + ".part"
+    rows, writer, schema, written = 0, None, None, False
+    try:
+        for chunk in chunks:
+            if fmt == "csv":
+                chunk.to_csv(tmp, mode="a" if written else "w", header=not written, index=False)
+            else:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                if writer is None:
+                    schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+                    writer = pq.ParquetWriter(tmp, schema)
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+            written = True
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    if not written:
+        raise ValueError(f"nothing to write to {path}")
+    os.replace(tmp, path)
+    return rows
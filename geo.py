@@ -0,0 +1,95 @@
+"""State-name → geojson feature index for the choropleths.
+
+Dataset state names ("JAMMU AND KASHMIR", "THE DADRA AND NAGAR HAVELI AND
+DAMAN AND DIU", older spellings such as "ORISSA") do not match the geojson's
+``properties.ST_NM`` values ("Jammu & Kashmir", ...) character for character.
+This module gives every feature an integer ``id`` and resolves each dataset
+state to one of those ids once, at load time, through a normalised name plus
+an alias table. Rows carry the id in ``state_id``, so the map joins on
+integers and never re-normalises strings per render. Names that resolve to no
+feature are reported instead of silently disappearing from the map.
+
+    python geo.py            # print the index and anything unmatched
+"""
+import json
+import re
+from dataclasses import dataclass, field
+
+GEOJSON_PATH = "india_states.geojson"
+UNMATCHED_ID = -1
+
+# normalised alternative spelling → normalised ST_NM
+ALIASES = {
+    "andaman and nicobar islands":              "andaman and nicobar",
+    "dadra and nagar haveli":                   "dadra and nagar haveli and daman and diu",
+    "daman and diu":                            "dadra and nagar haveli and daman and diu",
+    "dadra nagar haveli and daman diu":         "dadra and nagar haveli and daman and diu",
+    "nct of delhi":                             "delhi",
+    "delhi nct":                                "delhi",
+    "orissa":                                   "odisha",
+    "pondicherry":                              "puducherry",
+    "uttaranchal":                              "uttarakhand",
+    "chattisgarh":                              "chhattisgarh",
+    "telengana":                                "telangana",
+}
+
+
+def normalize(name):
+    """Case-, punctuation- and '&'/'and'-insensitive form of a state name."""
+    s = str(name).casefold().replace("&", " and ")
+    s = re.sub(r"[^a-z ]+", " ", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    if s.startswith("the "):
+        s = s[4:]
+    return ALIASES.get(s, s)
+
+
+def load_geojson(path=GEOJSON_PATH):
+    """Parse the geojson and number its features 0..n-1 in file order."""
+    with open(path) as f:
+        gj = json.load(f)
+    for i, feature in enumerate(gj["features"]):
+        feature["id"] = i
+    return gj
+
+
+def feature_names(geojson):
+    """Feature id → ST_NM, the label the maps and trend lines show."""
+    return {f["id"]: f["properties"]["ST_NM"] for f in geojson["features"]}
+
+
+@dataclass
+class StateIndex:
+    ids:       dict                              # dataset state → feature id
+    names:     dict                              # feature id → ST_NM
+    unmatched: list = field(default_factory=list)   # dataset states with no feature
+
+    def features_without_data(self):
+        used = set(self.ids.values())
+        return sorted(name for i, name in self.names.items() if i not in used)
+
+
+def build_state_index(states, geojson):
+    names = feature_names(geojson)
+    by_norm = {normalize(name): i for i, name in names.items()}
+    ids, unmatched = {}, []
+    for state in states:
+        if state is None or state != state:   # None / NaN
+            continue
+        i = by_norm.get(normalize(state))
+        if i is None:
+            unmatched.append(state)
+            i = UNMATCHED_ID
+        ids[state] = i
+    return StateIndex(ids, names, sorted(unmatched))
+
+
+if __name__ == "__main__":
+    from data_prep import load_dataset
+
+    df, report = load_dataset()
+    index = build_state_index(df["state"].unique(), load_geojson())
+    for state, i in sorted(index.ids.items()):
+        print(f"{state:<50} → {i:>3}  {index.names.get(i, '(unmatched)')}")
+    print(f"\nunmatched dataset states: {index.unmatched or 'none'}")
+    print(f"map features without data: {index.features_without_data() or 'none'}")
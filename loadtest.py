@@ -0,0 +1,228 @@
+"""Load test: many concurrent headless dashboard sessions.
+
+Each simulated user is a Streamlit ``AppTest`` session running dash17.py and
+replaying an interaction trace (filter changes, metric picks on each tab).
+``AppTest`` is not thread-safe (every run installs and then clears the
+process-wide runtime and patches global config), so each user gets its own
+spawned process. A process loads the data into its own caches with one
+untimed cold run; then all users start their traces together. The numbers
+therefore describe N dashboard processes competing for the machine, not N
+sessions sharing one server's caches. Switching tabs happens in the browser
+and triggers no rerun, so tab use is modelled as picking metrics on each tab.
+
+For each concurrency level it reports p50/p95/p99 rerun latency, throughput
+(reruns per second across all sessions), resident memory per session, and
+errors split into app errors (exceptions raised by dash17.py) and harness
+errors (a widget the trace expects is missing, a rerun timing out, ...).
+
+    python loadtest.py --levels 1 2 4 8 16 --rounds 2
+    UDISE_BACKEND=duckdb python loadtest.py --levels 4 16 --think 0.5 --csv load.csv
+"""
+import argparse
+import logging
+import multiprocessing as mp
+import os
+import queue
+import random
+import resource
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dash17.py")
+
+
+# ─── Interaction traces ───────────────────────────────────────────────────────
+def _multiselect(at, label):
+    for w in at.multiselect:
+        if w.label == label:
+            return w
+    raise LookupError(f"no {label!r} multiselect on the page")
+
+
+def pick_states(k):
+    def step(at, rng):
+        w = _multiselect(at, "State")
+        w.set_value(rng.sample(w.options, min(k, len(w.options))))
+    return step
+
+
+def pick_district(at, rng):
+    w = _multiselect(at, "District")
+    if w.options:
+        w.set_value([rng.choice(w.options)])
+
+
+def pick_one(label):
+    def step(at, rng):
+        w = _multiselect(at, label)
+        w.set_value([rng.choice(w.options)])
+    return step
+
+
+def reset(label):
+    def step(at, rng):
+        w = _multiselect(at, label)
+        w.set_value(w.options)
+    return step
+
+
+def pick_metric(tab_key):
+    def step(at, rng):
+        w = at.selectbox(key=f"{tab_key}_metric")
+        w.set_value(rng.choice(w.options))
+    return step
+
+
+TRACES = {
+    # a reader flicking through the metrics on every tab
+    "browse": [pick_metric("wash"), pick_metric("wash"), pick_metric("eq"),
+               pick_metric("eq"), pick_metric("dig"), pick_metric("dig")],
+    # narrowing down to a few states, then one district
+    "drill":  [pick_states(3), pick_metric("wash"), pick_district, pick_metric("eq"),
+               reset("State")],
+    # slicing by school segment
+    "segment": [pick_one("Management"), pick_metric("wash"), pick_one("Location"),
+                pick_one("Category"), reset("Management"), reset("Location"), reset("Category")],
+}
+
+
+# ─── Measurement ──────────────────────────────────────────────────────────────
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024**2
+    except OSError:
+        # peak, not current, RSS; KiB on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+def run_user(trace, seed, rounds, think, timeout, start, results):
+    """One simulated user, in its own process: cold run, wait for the others, replay the trace."""
+    logging.getLogger("streamlit").setLevel(logging.ERROR)   # bare-mode warnings on every rerun
+    rng = random.Random(seed)
+    out = {"latencies": [], "app_errors": [], "harness_errors": [], "cold_s": np.nan}
+    at = AppTest.from_file(APP, default_timeout=timeout)
+    try:
+        t0 = time.perf_counter()
+        at.run()
+        out["cold_s"] = time.perf_counter() - t0
+        out["app_errors"] += [e.value for e in at.exception]
+    except Exception as e:
+        out["harness_errors"].append(f"cold run: {e!r}")
+    try:
+        start.wait()
+    except threading.BrokenBarrierError:
+        out["harness_errors"].append("start barrier broken")
+        results.put(out)
+        return
+
+    for step in TRACES[trace] * rounds:
+        if think:
+            time.sleep(rng.uniform(0, 2 * think))
+        try:
+            step(at, rng)
+        except Exception as e:
+            out["harness_errors"].append(f"step: {e!r}")
+            continue
+        try:
+            t0 = time.perf_counter()
+            at.run()
+            out["latencies"].append(time.perf_counter() - t0)
+        except Exception as e:
+            out["harness_errors"].append(f"rerun: {e!r}")
+            continue
+        out["app_errors"] += [e.value for e in at.exception]
+    out["rss_mb"] = rss_mb()
+    results.put(out)
+
+
+def run_level(users, rounds, think, timeout, seed):
+    ctx = mp.get_context("spawn")
+    start, results = ctx.Barrier(users + 1), ctx.Queue()
+    names = list(TRACES)
+    procs = [
+        ctx.Process(target=run_user,
+                    args=(names[i % len(names)], seed + i, rounds, think, timeout, start, results))
+        for i in range(users)
+    ]
+    for p in procs:
+        p.start()
+
+    outs, lost = [], 0
+    try:
+        start.wait(timeout=2 * timeout)   # every user has finished its cold run
+    except threading.BrokenBarrierError:
+        pass                               # a worker died or stalled; the others report a broken barrier
+    t0 = time.perf_counter()
+    steps = max(len(t) for t in TRACES.values()) * rounds
+    deadline = t0 + (timeout + 2 * think) * steps + timeout
+    for _ in procs:
+        try:
+            outs.append(results.get(timeout=max(deadline - time.perf_counter(), 1)))
+        except queue.Empty:
+            lost += 1
+    wall = time.perf_counter() - t0
+    for p in procs:
+        p.join(timeout=5)
+        if p.is_alive():
+            p.terminate()
+
+    latencies = [x for o in outs for x in o["latencies"]]
+    app_errors = [e for o in outs for e in o["app_errors"]]
+    harness_errors = [e for o in outs for e in o["harness_errors"]] + ["worker did not report"] * lost
+    rss = [o["rss_mb"] for o in outs if "rss_mb" in o]
+    lat_ms = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(lat_ms, [50, 95, 99]) if len(lat_ms) else (np.nan,) * 3
+    return {
+        "users":          users,
+        "reruns":         len(latencies),
+        "app_errors":     len(app_errors),
+        "harness_errors": len(harness_errors),
+        "p50_ms":         p50,
+        "p95_ms":         p95,
+        "p99_ms":         p99,
+        "reruns_per_s":   len(latencies) / wall if wall > 0 else np.nan,
+        "cold_start_s":   np.nanmedian([o["cold_s"] for o in outs]) if outs else np.nan,
+        "mb_per_session": np.mean(rss) if rss else np.nan,
+        "rss_mb":         sum(rss),
+    }, app_errors, harness_errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--rounds", type=int, default=1, help="times each user repeats their trace")
+    parser.add_argument("--think", type=float, default=0.0, help="mean think time between actions (s)")
+    parser.add_argument("--timeout", type=float, default=120, help="per-rerun timeout (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--csv", help="also write the results table to this CSV")
+    args = parser.parse_args(argv)
+
+    rows = []
+    for users in args.levels:
+        row, app_errors, harness_errors = run_level(users, args.rounds, args.think, args.timeout, args.seed)
+        rows.append(row)
+        print(f"{users:>4} users  p50 {row['p50_ms']:7.0f} ms  p95 {row['p95_ms']:7.0f} ms  "
+              f"p99 {row['p99_ms']:7.0f} ms  {row['reruns_per_s']:6.1f} reruns/s  "
+              f"{row['mb_per_session']:6.0f} MB/session  app errors {row['app_errors']}  "
+              f"harness errors {row['harness_errors']}", flush=True)
+        for e in app_errors[:3]:
+            print("       app:    ", e)
+        for e in harness_errors[:3]:
+            print("       harness:", e)
+
+    table = pd.DataFrame(rows)
+    print()
+    print(table.to_string(index=False, float_format="{:.1f}".format))
+    if args.csv:
+        table.to_csv(args.csv, index=False)
+
+
+if __name__ == "__main__":
+    main()
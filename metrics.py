@@ -0,0 +1,119 @@
+"""Metric registry: every dashboard metric and tab, declared once.
+
+A ``Metric`` names the column it produces, the raw columns it is derived
+from, how it is derived (``None`` = the raw column is used as-is) and how it
+aggregates. A ``Tab`` lists which metrics it shows as KPI donuts, which can
+be picked for the map / ranking / breakdown panels, and any extra headline
+numbers. ``data_prep`` derives every column from this registry once at load
+time, and ``dash17.py`` and ``reports.py`` build all their panels from it.
+It imports nothing heavy, so the dashboard can use it before pandas loads.
+
+Only the ``"mean"`` aggregation is implemented by the backends today, so a
+metric declaring any other ``agg`` is rejected when the registry is built
+rather than silently averaged. ``sources`` are checked before a metric is
+derived, so a missing raw column fails with the metric's name.
+"""
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+AGGREGATIONS = ("mean",)   # what backends.means / means_by compute
+
+
+@dataclass(frozen=True)
+class Metric:
+    key: str                       # column the metric lives in
+    label: str
+    sources: tuple = ()            # raw columns it is derived from
+    derive: Optional[Callable] = None
+    agg: str = "mean"
+    fmt: str = ".0%"
+
+    def __post_init__(self):
+        if self.agg not in AGGREGATIONS:
+            raise ValueError(f"metric {self.key!r}: agg={self.agg!r} is not implemented "
+                             f"(backends compute {', '.join(AGGREGATIONS)})")
+
+
+@dataclass(frozen=True)
+class Tab:
+    key: str
+    title: str
+    header: str
+    kpis: tuple                    # donuts across the top
+    selectable: tuple              # choices for the map / ranking / breakdowns
+    headline: str                  # the one metric the static reports chart by district / group
+    stats: dict = field(default_factory=dict)   # st.metric label → metric key
+
+
+def flag(key, label, source):
+    """1 where the raw code column equals 1 (“available/functional”), else 0."""
+    return Metric(key, label, (source,), lambda df: (df[source] == 1).astype(int))
+
+
+def share_equals_one(key, label, numerator, denominator):
+    """1 where every counted item is functional; a zero denominator gives 0."""
+    return Metric(key, label, (numerator, denominator),
+                  lambda df: ((df[numerator] / df[denominator]) == 1).astype(int))
+
+
+def composite(key, label, parts):
+    """Row-wise mean of other metrics."""
+    return Metric(key, label, tuple(parts), lambda df: df[list(parts)].mean(axis=1))
+
+
+# Order matters: composites come after the metrics they average.
+METRICS = {m.key: m for m in [
+    flag("func_electricity", "Functional Electricity", "electricity_availability"),
+    flag("func_water",       "Functional Water",       "tap_fun_yn"),
+    flag("func_handwash",    "Functional Handwash",    "handwash_facility_for_meal"),
+    flag("playground",       "Playground",             "playground_available"),
+    flag("library",          "Library",                "library_availability"),
+    flag("internet",         "Internet",               "internet"),
+    flag("ramps",            "Ramps",                  "ramps"),
+    flag("handrails",        "Handrails",              "handrails"),
+    flag("ict_lab",          "ICT Labs",               "ict_lab"),
+    share_equals_one("pct_toilet_func_girls", "Girls’ Toilets (%)",
+                     "total_girls_func_toilet", "total_girls_toilet"),
+    Metric("computer_yn", "Computers", ("desktop",),
+           lambda df: (df["desktop"] > 0).astype(int)),
+    Metric("desktop", "Avg PCs/School", fmt=".1f"),
+    composite("infra_index",  "Composite Infra Index",
+              ["func_electricity", "func_water", "pct_toilet_func_girls", "func_handwash"]),
+    composite("equity_index", "Composite Equity Index",
+              ["ramps", "handrails", "pct_toilet_func_girls"]),
+]}
+
+TABS = [
+    Tab("wash", "WASH+ Infrastructure", "WASH+ Infrastructure",
+        kpis=("func_electricity", "func_water", "pct_toilet_func_girls", "func_handwash"),
+        selectable=("func_electricity", "func_water", "pct_toilet_func_girls", "func_handwash",
+                    "infra_index"),
+        headline="infra_index"),
+    Tab("eq", "Equity & Accessibility", "Equity & Accessibility",
+        kpis=("ramps", "handrails", "pct_toilet_func_girls"),
+        selectable=("ramps", "handrails", "pct_toilet_func_girls", "equity_index"),
+        headline="equity_index",
+        stats={"Internet (avail %)": "internet",
+               "ICT Labs (avail %)": "ict_lab",
+               "Avg PCs/School":     "desktop"}),
+    Tab("dig", "Digital & ICT", "Digital & ICT Readiness",
+        kpis=("internet", "ict_lab", "computer_yn"),
+        selectable=("internet", "ict_lab", "computer_yn"),
+        headline="computer_yn"),
+]
+
+# Every metric some tab shows, in first-use order
+TAB_METRIC_KEYS = list(dict.fromkeys(
+    key for tab in TABS for key in (*tab.kpis, *tab.selectable, *tab.stats.values())
+))
+
+
+def derive_columns(df):
+    """Add every derived metric column to `df` in place, in registry order."""
+    for metric in METRICS.values():
+        if metric.derive is not None:
+            missing = [c for c in metric.sources if c not in df.columns]
+            if missing:
+                raise KeyError(f"metric {metric.key!r} needs columns {missing}")
+            df[metric.key] = metric.derive(df)
+    return df
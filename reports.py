@@ -0,0 +1,216 @@
+"""Headless batch generation of the state-wise infrastructure reports.
+
+Loads the dataset once, then fans the states out over a process pool. Each
+worker computes the WASH+, Equity and Digital metrics the dashboard tabs show
+for every filter preset and writes one static HTML page per (state, preset),
+with optional PNG figures. An index page and a summary CSV tie the run
+together; plotly.js is written once into the output directory, so the pages
+open without network access.
+
+    python reports.py --out reports/2025-07
+    python reports.py --out reports/2025-07 --states BIHAR GOA --presets all rural --png
+    python reports.py --backend duckdb --parquet data/udise.parquet --workers 8
+
+Workers are forked where the platform allows it, so they share the parent's
+loaded frame copy-on-write instead of each re-reading the CSVs.
+"""
+import argparse
+import html
+import multiprocessing as mp
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from backends import PARQUET_PATH, DuckDBBackend, PandasBackend
+from data_prep import default_filters, prepare_data
+from metrics import METRICS, TAB_METRIC_KEYS, TABS
+
+PRIMARY, SECONDARY, ACCENT = "#5D3FD3", "#FF6B6B", "#4ECDC4"
+
+# tab title → (columns, headline column): everything the tab shows, from the metric registry
+TAB_METRICS = {
+    tab.title: (list(dict.fromkeys((*tab.kpis, *tab.selectable, *tab.stats.values()))), tab.headline)
+    for tab in TABS
+}
+
+# preset name → filters applied on top of "everything selected"
+PRESETS = {
+    "all":        {},
+    "government": {"management": ["Government"]},
+    "aided":      {"management": ["Government Aided"]},
+    "private":    {"management": ["Private"]},
+    "rural":      {"location": ["Rural"]},
+    "urban":      {"location": ["Urban"]},
+}
+
+PLOTLY_JS = "plotly.min.js"   # the bundled copy matching the installed plotly, at the top of --out
+
+_backend = None
+
+
+def _init_worker(kind, payload):
+    # Under fork `payload` is inherited, not pickled; under spawn it is sent once per worker.
+    global _backend
+    if kind == "duckdb":
+        _backend = DuckDBBackend(payload, threads=1)
+    else:
+        _backend = PandasBackend(payload)
+
+
+def slugify(name):
+    return re.sub(r"[^a-z0-9]+", "_", str(name).lower()).strip("_")
+
+
+def state_report(state, presets, opts, out_dir, png=False):
+    """Compute and render every preset for one state; returns summary rows."""
+    import plotly.express as px
+
+    state_dir = os.path.join(out_dir, slugify(state))
+    os.makedirs(state_dir, exist_ok=True)
+    summary = []
+
+    for preset in presets:
+        filters = {**default_filters(opts), "state": [state], **PRESETS[preset]}
+        n_schools = _backend.count(filters)
+        sections, figures = [], []
+        row = {"state": state, "preset": preset, "schools": n_schools}
+
+        # one pass per group-by over every tab's columns; the tabs take their slices
+        all_kpis = _backend.means(TAB_METRIC_KEYS, filters)
+        all_by_district = _backend.means_by("district", TAB_METRIC_KEYS, filters)
+        all_by_mgmt = _backend.means_by("management", TAB_METRIC_KEYS, filters)
+        all_by_loc = _backend.means_by("location", TAB_METRIC_KEYS, filters)
+
+        for tab, (cols, headline) in TAB_METRICS.items():
+            labels = {c: METRICS[c].label for c in cols}
+            kpis = all_kpis[cols]
+            by_district = all_by_district[cols]
+            by_mgmt = all_by_mgmt[cols]
+            by_loc = all_by_loc[cols]
+
+            row.update({labels[c]: kpis[c] for c in cols})
+
+            # shares share one 0–1 axis; counts such as PCs per school get their own chart
+            shares = [c for c in cols if METRICS[c].fmt.endswith("%")]
+            fig_kpi = px.bar(x=[labels[c] for c in shares], y=[kpis[c] for c in shares],
+                             labels={"x": "", "y": ""}, range_y=(0, 1))
+            fig_kpi.update_traces(marker_color=PRIMARY)
+            fig_dist = px.bar(by_district[headline].sort_values().reset_index(),
+                              x=headline, y="district", orientation="h",
+                              labels={headline: labels[headline], "district": "District"})
+            fig_dist.update_traces(marker_color=PRIMARY)
+            fig_mgmt = px.bar(by_mgmt[headline].reset_index(), x="management", y=headline,
+                              color="management", color_discrete_sequence=[PRIMARY, SECONDARY, ACCENT],
+                              labels={"management": "Management", headline: labels[headline]})
+            fig_loc = px.bar(by_loc[headline].reset_index(), x="location", y=headline,
+                             color="location", color_discrete_map={"Urban": PRIMARY, "Rural": SECONDARY},
+                             labels={"location": "Location", headline: labels[headline]})
+            tab_figs = {"kpis": fig_kpi, "districts": fig_dist, "management": fig_mgmt, "location": fig_loc}
+            if len(shares) < len(cols):
+                others = [c for c in cols if c not in shares]
+                tab_figs["stats"] = px.bar(x=[labels[c] for c in others], y=[kpis[c] for c in others],
+                                           labels={"x": "", "y": ""})
+                tab_figs["stats"].update_traces(marker_color=ACCENT)
+            for fig in tab_figs.values():
+                fig.update_layout(margin=dict(l=0, r=0, t=30, b=0), height=350, showlegend=False)
+            figures += [(f"{slugify(tab)}_{name}", fig) for name, fig in tab_figs.items()]
+
+            formatters = {labels[c]: f"{{:{METRICS[c].fmt}}}".format for c in cols}
+            tables = {
+                "By district":   by_district,
+                "By management": by_mgmt,
+                "By location":   by_loc,
+            }
+            sections.append(
+                f"<h2>{html.escape(tab)}</h2>"
+                + "".join(fig.to_html(full_html=False, include_plotlyjs=False) for fig in tab_figs.values())
+                + "".join(
+                    f"<h3>{name}</h3>" + t.rename(columns=labels).to_html(formatters=formatters)
+                    for name, t in tables.items()
+                )
+            )
+
+        summary.append(row)
+        title = f"{state} — {preset} schools"
+        page = os.path.join(state_dir, f"{preset}.html")
+        with open(page, "w", encoding="utf-8") as f:
+            f.write(_page(title, f"<p>{n_schools:,} schools</p>" + "".join(sections), f"../{PLOTLY_JS}"))
+        if png:
+            for name, fig in figures:
+                fig.write_image(os.path.join(state_dir, f"{preset}_{name}.png"))
+
+    return summary
+
+
+def _page(title, body, plotly_src=None):
+    script = f"<script src='{plotly_src}'></script>" if plotly_src else ""
+    return (
+        "<!doctype html><html><head><meta charset='utf-8'>"
+        f"<title>{html.escape(title)}</title>{script}"
+        "<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse}"
+        "td,th{padding:2px 8px;border-bottom:1px solid #ddd;text-align:right}</style>"
+        f"</head><body><h1>{html.escape(title)}</h1>{body}</body></html>"
+    )
+
+
+def write_index(summary, out_dir):
+    summary.to_csv(os.path.join(out_dir, "summary.csv"), index=False)
+    rows = "".join(
+        f"<li><a href='{slugify(state)}/{preset}.html'>{html.escape(state)} — {preset}</a></li>"
+        for state, preset in summary[["state", "preset"]].drop_duplicates().itertuples(index=False)
+    )
+    with open(os.path.join(out_dir, "index.html"), "w", encoding="utf-8") as f:
+        f.write(_page("UDISE+ state-wise infrastructure reports", f"<ul>{rows}</ul>"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", default=os.path.join("reports", time.strftime("%Y-%m")))
+    parser.add_argument("--states", nargs="*", help="states to report (default: all)")
+    parser.add_argument("--presets", nargs="*", choices=list(PRESETS), default=list(PRESETS))
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--png", action="store_true", help="also write PNG figures (needs kaleido)")
+    parser.add_argument("--backend", choices=["pandas", "duckdb"], default="pandas")
+    parser.add_argument("--parquet", default=PARQUET_PATH)
+    args = parser.parse_args(argv)
+
+    if args.png:
+        try:
+            import kaleido  # noqa: F401
+        except ImportError:
+            parser.error("--png needs the kaleido package (pip install kaleido)")
+
+    start = time.perf_counter()
+    if args.backend == "duckdb":
+        kind, payload = "duckdb", args.parquet
+        opts = DuckDBBackend(args.parquet).filter_options()
+    else:
+        kind, payload = "pandas", prepare_data()
+        opts = PandasBackend(payload).filter_options()
+    states = args.states or opts["state"]
+    print(f"Loaded dataset in {time.perf_counter() - start:.1f}s; "
+          f"{len(states)} states × {len(args.presets)} presets")
+
+    os.makedirs(args.out, exist_ok=True)
+    from plotly.offline import get_plotlyjs
+    with open(os.path.join(args.out, PLOTLY_JS), "w", encoding="utf-8") as f:
+        f.write(get_plotlyjs())
+    ctx = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else "spawn")
+    summary = []
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=ctx,
+                             initializer=_init_worker, initargs=(kind, payload)) as pool:
+        futures = {pool.submit(state_report, s, args.presets, opts, args.out, args.png): s for s in states}
+        for future in as_completed(futures):
+            summary += future.result()
+            print(f"  {futures[future]} done")
+
+    write_index(pd.DataFrame(summary).sort_values(["state", "preset"]), args.out)
+    print(f"Wrote {len(summary)} reports to {args.out} "
+          f"in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import io
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+GEOJSON = os.path.join(ROOT, "india_states.geojson")
+STATES = ["BIHAR", "GOA", "ORISSA", "JAMMU AND KASHMIR"]
+
+
+def make_extracts(n=200, seed=0):
+    """Raw profile and facility frames shaped like the UDISE+ extracts."""
+    rng = np.random.default_rng(seed)
+    state = rng.choice(STATES, n)
+    prof = pd.DataFrame({
+        "pseudocode": np.arange(n) + 1000,
+        "state": state,
+        "district": [f"{s[:3]}-D{d}" for s, d in zip(state, rng.integers(1, 4, n))],
+        "managment": rng.choice([1, 2, 3], n),
+        "rural_urban": rng.choice([1, 2], n),
+        "school_category": rng.choice([1, 2, 3, 4], n),
+        "minority_school": rng.choice([1, 2], n),
+        "resi_school": rng.choice([1, 2, 3], n),
+        "special_school_for_cwsn": rng.choice([1, 2], n),
+    })
+    flags = ["electricity_availability", "tap_fun_yn", "handwash_facility_for_meal", "playground_available",
+             "library_availability", "internet", "availability_ramps", "availability_of_handrails",
+             "comp_ict_lab_yn"]
+    fac = pd.DataFrame({
+        "pseudocode": np.arange(n) + 1000,
+        **{c: rng.choice([1, 2], n) for c in flags},
+        "total_girls_func_toilet": rng.integers(0, 3, n),
+        "total_girls_toilet": rng.integers(1, 3, n),
+        "desktop": rng.integers(0, 5, n),
+    })
+    return prof, fac
+
+
+def as_csv(df):
+    return io.StringIO(df.to_csv(index=False))
+
+
+@pytest.fixture
+def load():
+    """load_dataset() over in-memory extracts."""
+    from data_prep import load_dataset
+
+    def _load(prof, fac, **kwargs):
+        return load_dataset(as_csv(prof), as_csv(fac), geojson_path=GEOJSON, **kwargs)
+    return _load
+
+
+@pytest.fixture
+def backends(load, tmp_path):
+    """(PandasBackend, DuckDBBackend) over the same synthetic schools."""
+    pytest.importorskip("duckdb")
+    from backends import DuckDBBackend, PandasBackend, write_parquet
+
+    df, _ = load(*make_extracts())
+    path = str(tmp_path / "udise.parquet")
+    write_parquet(df, path)
+    return PandasBackend(df), DuckDBBackend(path)
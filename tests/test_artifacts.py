@@ -0,0 +1,33 @@
+from artifacts import load_summary, save_summary
+from metrics import TAB_METRIC_KEYS
+
+
+def write(tmp_path, kpis):
+    source = tmp_path / "source.csv"
+    source.write_text("a\n1\n")
+    path = str(tmp_path / "udise.summary.json")
+    save_summary({"schools": 1, "kpis": kpis}, path, [str(source)])
+    return path, source
+
+
+def test_summary_is_fresh(tmp_path):
+    path, _ = write(tmp_path, {k: 0.5 for k in TAB_METRIC_KEYS})
+    assert load_summary(path)["schools"] == 1
+
+
+def test_changed_source_invalidates(tmp_path):
+    path, source = write(tmp_path, {k: 0.5 for k in TAB_METRIC_KEYS})
+    source.write_text("a\n1\n2\n")
+    assert load_summary(path) is None
+
+
+def test_missing_kpi_invalidates(tmp_path):
+    path, _ = write(tmp_path, {k: 0.5 for k in TAB_METRIC_KEYS[1:]})
+    assert load_summary(path) is None
+
+
+def test_unreadable_summary(tmp_path):
+    path = tmp_path / "udise.summary.json"
+    assert load_summary(str(path)) is None
+    path.write_text("{")
+    assert load_summary(str(path)) is None
@@ -0,0 +1,39 @@
+import pytest
+
+pytest.importorskip("duckdb")
+
+from backends import check_cases, compare_backends  # noqa: E402
+from data_prep import METRIC_COLUMNS, default_filters  # noqa: E402
+
+
+@pytest.mark.parametrize("case", ["all schools", "one state", "one district", "rural government",
+                                  "nothing selected"])
+def test_pandas_and_duckdb_agree(backends, case):
+    pandas_be, duck_be = backends
+    filters = check_cases(pandas_be.filter_options())[case]
+    assert compare_backends(pandas_be, duck_be, filters, METRIC_COLUMNS, groups=("state", "district")) == []
+
+
+def test_counts_by_group_agree(backends):
+    pandas_be, duck_be = backends
+    filters = default_filters(pandas_be.filter_options())
+    assert pandas_be.count_by("management", filters).to_dict() == duck_be.count_by("management", filters).to_dict()
+
+
+def test_filter_options_agree(backends):
+    pandas_be, duck_be = backends
+    assert pandas_be.filter_options() == duck_be.filter_options()
+
+
+def test_filter_projects_columns(backends):
+    filters = {"state": ["GOA"], "location": ["Rural"]}
+    pandas_rows, duck_rows = (be.filter(filters, ["pseudocode", "desktop", "desktop"]) for be in backends)
+    assert list(pandas_rows.columns) == list(duck_rows.columns) == ["pseudocode", "desktop"]
+    assert sorted(pandas_rows["pseudocode"]) == sorted(duck_rows["pseudocode"])
+
+
+def test_mask_is_reused_per_filter_set(backends):
+    pandas_be, _ = backends
+    filters = default_filters(pandas_be.filter_options())
+    assert pandas_be.mask(filters) is pandas_be.mask(dict(filters))
+    assert list(pandas_be.filter(filters, ["state", "desktop"]).columns) == ["state", "desktop"]
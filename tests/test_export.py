@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+
+from data_prep import METRIC_COLUMNS, default_filters
+from export import DATASETS, FORMATS, run_export
+
+
+def read(path, fmt):
+    return pd.read_csv(path) if fmt == "csv" else pd.read_parquet(path)
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+@pytest.mark.parametrize("dataset", list(DATASETS))
+@pytest.mark.parametrize("empty", [False, True], ids=["all", "no-state"])
+@pytest.mark.parametrize("which", [0, 1], ids=["pandas", "duckdb"])
+def test_export_round_trip(backends, tmp_path, which, empty, dataset, fmt):
+    backend = backends[which]
+    filters = default_filters(backend.filter_options())
+    if empty:
+        filters["state"] = []
+    path, rows = run_export(backend, dataset, filters, fmt, export_dir=str(tmp_path))
+    out = read(path, fmt)
+
+    by = DATASETS[dataset]
+    if by is None:
+        expected = backend.filter(filters)
+        assert rows == len(out) == backend.count(filters)
+        assert list(out.columns) == list(expected.columns)
+    else:
+        expected = backend.means_by(by, METRIC_COLUMNS, filters)
+        assert rows == len(out) == len(expected)
+        assert list(out.columns) == [by, "schools", *METRIC_COLUMNS]
+        assert out["schools"].sum() == backend.count(filters)
+    assert (rows == 0) == empty
+
+
+def test_export_names_are_unique(backends, tmp_path):
+    backend = backends[0]
+    filters = default_filters(backend.filter_options())
+    paths = {run_export(backend, "By state", filters, export_dir=str(tmp_path))[0] for _ in range(3)}
+    assert len(paths) == 3
@@ -0,0 +1,49 @@
+import pytest
+
+from conftest import GEOJSON
+
+from geo import UNMATCHED_ID, build_state_index, load_geojson, normalize
+
+
+def geojson(*names):
+    return {"type": "FeatureCollection",
+            "features": [{"id": i, "properties": {"ST_NM": name}} for i, name in enumerate(names)]}
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("JAMMU AND KASHMIR",                              "jammu and kashmir"),
+    ("Jammu & Kashmir",                                "jammu and kashmir"),
+    ("  Tamil   Nadu ",                                "tamil nadu"),
+    ("ORISSA",                                         "odisha"),
+    ("Pondicherry",                                    "puducherry"),
+    ("NCT of Delhi",                                   "delhi"),
+    ("THE DADRA AND NAGAR HAVELI AND DAMAN AND DIU",   "dadra and nagar haveli and daman and diu"),
+    ("Daman & Diu",                                    "dadra and nagar haveli and daman and diu"),
+    ("Andaman and Nicobar Islands",                    "andaman and nicobar"),
+])
+def test_normalize(name, expected):
+    assert normalize(name) == expected
+
+
+def test_build_state_index():
+    gj = geojson("Jammu & Kashmir", "Odisha", "Dadra and Nagar Haveli and Daman and Diu", "Goa")
+    index = build_state_index(
+        ["JAMMU AND KASHMIR", "ORISSA", "ODISHA", "DAMAN AND DIU", "DADRA AND NAGAR HAVELI",
+         "ATLANTIS", None, float("nan")],
+        gj,
+    )
+    assert index.ids == {
+        "JAMMU AND KASHMIR": 0, "ORISSA": 1, "ODISHA": 1,
+        "DAMAN AND DIU": 2, "DADRA AND NAGAR HAVELI": 2, "ATLANTIS": UNMATCHED_ID,
+    }
+    assert index.unmatched == ["ATLANTIS"]
+    assert index.features_without_data() == ["Goa"]
+
+
+def test_shipped_geojson_resolves_dataset_spellings():
+    index = build_state_index(
+        ["JAMMU AND KASHMIR", "THE DADRA AND NAGAR HAVELI AND DAMAN AND DIU", "ANDAMAN AND NICOBAR ISLANDS",
+         "ORISSA", "DELHI", "TAMIL NADU"],
+        load_geojson(GEOJSON),
+    )
+    assert index.unmatched == []
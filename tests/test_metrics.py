@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_extracts
+from data_prep import FACILITY_RENAMES, PROFILE_RENAMES
+from metrics import METRICS, Metric, derive_columns
+
+
+def baseline_flags(df):
+    """Feature engineering as the original dashboard's load_data() did it."""
+    df = df.copy()
+    df["func_electricity"]      = df["electricity_availability"] == 1
+    df["func_water"]            = df["tap_fun_yn"] == 1
+    df["func_handwash"]         = df["handwash_facility_for_meal"] == 1
+    df["playground"]            = df["playground_available"] == 1
+    df["library"]               = df["library_availability"] == 1
+    df["internet"]              = df["internet"] == 1
+    df["ramps"]                 = df["ramps"] == 1
+    df["handrails"]             = df["handrails"] == 1
+    df["pct_toilet_func_girls"] = df["total_girls_func_toilet"] / df["total_girls_toilet"]
+    df["computer_yn"] = np.where(df["desktop"] > 0, 1, 0)
+    for col in ["func_electricity", "func_water", "pct_toilet_func_girls", "func_handwash",
+                "ramps", "handrails", "internet", "ict_lab"]:
+        df[col] = (df[col] == 1).astype(int)
+    df["infra_index"] = df[["func_electricity", "func_water", "pct_toilet_func_girls", "func_handwash"]].mean(axis=1)
+    df["equity_index"] = df[["ramps", "handrails", "pct_toilet_func_girls"]].mean(axis=1)
+    return df
+
+
+@pytest.fixture
+def raw():
+    prof, fac = make_extracts(300)
+    # zero denominators: 0/0 and n/0 must both count as "not all functional"
+    fac.loc[:9, "total_girls_toilet"] = 0
+    fac.loc[:4, "total_girls_func_toilet"] = 0
+    return prof.rename(columns=PROFILE_RENAMES).merge(fac.rename(columns=FACILITY_RENAMES), on="pseudocode")
+
+
+def test_derive_columns_matches_baseline(raw):
+    expected = baseline_flags(raw)
+    got = derive_columns(raw.copy())
+    for key in METRICS:
+        pd.testing.assert_series_equal(got[key].astype(float), expected[key].astype(float), check_names=False)
+    assert (got.loc[:9, "pct_toilet_func_girls"] == 0).all()
+
+
+def test_missing_source_names_the_metric(raw):
+    with pytest.raises(KeyError, match="func_water"):
+        derive_columns(raw.drop(columns="tap_fun_yn"))
+
+
+def test_unimplemented_aggregation_is_rejected():
+    with pytest.raises(ValueError, match="sum"):
+        Metric("desktop_total", "PCs", agg="sum")
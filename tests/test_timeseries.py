@@ -0,0 +1,71 @@
+import pandas as pd
+import pytest
+
+from conftest import ROOT, as_csv, make_extracts
+
+import timeseries
+
+
+@pytest.fixture
+def years():
+    """Two years of extracts: some schools change, two close, two open, ORISSA is renamed ODISHA."""
+    prof1, fac1 = make_extracts(60)
+    prof2, fac2 = prof1.copy(), fac1.copy()
+    fac2.loc[[3, 7, 11], "desktop"] += 1
+    prof2, fac2 = prof2.drop([20, 21]), fac2.drop([20, 21])
+    new_prof, new_fac = make_extracts(2, seed=1)
+    new_prof["pseudocode"] = new_fac["pseudocode"] = [5000, 5001]
+    prof2, fac2 = pd.concat([prof2, new_prof]), pd.concat([fac2, new_fac])
+    prof2["state"] = prof2["state"].replace("ORISSA", "ODISHA")
+    return {2023: (prof1, fac1), 2024: (prof2, fac2)}
+
+
+@pytest.fixture
+def store(years, tmp_path, monkeypatch):
+    monkeypatch.chdir(ROOT)   # ingest reads the geojson from the project root
+    path = str(tmp_path / "store")
+    for year, (prof, fac) in years.items():
+        timeseries.ingest_year(year, as_csv(prof), as_csv(fac), path)
+    return path
+
+
+def _sorted(df):
+    return df.sort_values("pseudocode").reset_index(drop=True)
+
+
+def test_changed_rows():
+    old = pd.DataFrame({"pseudocode": [1, 2, 3], "a": [1.0, None, 3.0], "b": ["x", "y", "z"]})
+    new = pd.DataFrame({"pseudocode": [1, 2, 3, 4], "a": [1.0, None, 3.5, 4.0], "b": ["x", "y", "z", "w"]})
+    assert timeseries.changed_rows(new, old)["pseudocode"].tolist() == [3, 4]
+    assert timeseries.changed_rows(new, None) is new
+
+
+def test_snapshot_round_trip(load, years, store):
+    assert timeseries.years(store) == [2023, 2024]
+    for year, (prof, fac) in years.items():
+        expected, _ = load(prof, fac)
+        got = timeseries.snapshot(year, store)
+        pd.testing.assert_frame_equal(_sorted(got)[expected.columns], _sorted(expected), check_dtype=False)
+
+
+def test_only_changes_are_stored(years, store):
+    prof1, _ = years[2023]
+    renamed = set(prof1.loc[prof1["state"] == "ORISSA", "pseudocode"])
+    rows = pd.read_parquet(f"{store}/rows/2024.parquet")
+    assert set(rows["pseudocode"]) == renamed | {1003, 1007, 1011, 5000, 5001}
+
+
+def test_trend_is_keyed_on_state_id(store):
+    agg = timeseries.load_aggregates(store)
+    odisha = agg[agg["state"] == "Odisha"]
+    assert odisha["year"].tolist() == [2023, 2024]        # ORISSA and ODISHA are one state
+    assert odisha["state_id"].nunique() == 1
+
+    ids = odisha["state_id"].unique().tolist()
+    line = timeseries.trend(agg, "desktop", ids, by_state=True)
+    assert line["state"].unique().tolist() == ["Odisha"]
+    assert line["yoy"].isna().tolist() == [True, False]
+
+
+def test_trend_without_store(tmp_path):
+    assert timeseries.load_aggregates(str(tmp_path)) is None
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from conftest import make_extracts
+
+
+@pytest.fixture
+def extracts():
+    """50 schools with one of each problem the validator looks for."""
+    prof, fac = make_extracts(50)
+    prof.loc[0, "managment"] = 5                         # unmapped code
+    prof.loc[1, "state"] = np.nan                        # missing key
+    prof.loc[2, "district"] = np.nan                     # missing district: warn only
+    prof.loc[4, "pseudocode"] = prof.loc[3, "pseudocode"]  # duplicate key
+    prof.loc[5, "pseudocode"] = 99_999                   # profile without facility
+    fac.loc[6, "desktop"] = -1                           # negative count: facility row rejected
+    return prof, fac
+
+
+def violations(report):
+    return {check: n for (check, _), n in report.violations.items()}
+
+
+def test_quarantine_counts(load, extracts):
+    df, report = load(*extracts, on_error="quarantine")
+    v = violations(report)
+    assert (report.rows_profile, report.rows_facility) == (50, 50)
+    assert report.rows_rejected == 6                     # profile rows 0, 1, 4, 5, 6 + facility row 6
+    assert report.rows_loaded == len(df) == 45
+    assert len(report.quarantined_rows()) == 6
+    assert v["unmapped_code"] == v["missing_key"] == v["duplicate_key"] == v["negative_count"] == 1
+    assert v["missing_value"] == 1
+    assert v["unmatched_profile"] == 2                   # row 5, and row 6 whose facility was rejected
+    # facilities of rejected profile rows are not merged either: 1000, 1001, 1004, 1005
+    assert v["unmatched_facility"] == 4
+    assert "unmatched_state" not in v
+
+
+def test_missing_district_is_kept(load, extracts):
+    df, _ = load(*extracts)
+    row = df[df["pseudocode"] == 1002]
+    assert len(row) == 1 and row["district"].isna().all()
+
+
+def test_drop_matches_quarantine_without_holding_rows(load, extracts):
+    df, report = load(*extracts, on_error="drop")
+    assert (report.rows_rejected, len(df)) == (6, 45)
+    assert report.quarantined_rows().empty
+
+
+def test_keep_loads_everything_that_merges(load, extracts):
+    df, report = load(*extracts, on_error="keep")
+    v = violations(report)
+    assert report.rows_rejected == 0
+    assert len(df) == 49                                 # only the profile row without a facility is lost
+    assert v["unmatched_profile"] == 1
+    assert v["unmatched_facility"] == 2                  # 1004 and 1005
+    assert v["unmatched_state"] == 1                     # the row with no state
+
+
+def test_report_round_trip(load, extracts, tmp_path):
+    from validate import DataQualityReport
+
+    _, report = load(*extracts)
+    path = tmp_path / "quality.json"
+    report.save(path)
+    assert DataQualityReport.load(path).to_dict() == report.to_dict()
+
+
+def test_unknown_policy(load, extracts):
+    with pytest.raises(ValueError):
+        load(*extracts, on_error="ignore")
@@ -0,0 +1,185 @@
+"""Multi-year UDISE+ store for year-over-year trends.
+
+The store is a directory of Parquet files keyed by (year, pseudocode):
+
+    store/keys/<year>.parquet     pseudocodes present in that year
+    store/rows/<year>.parquet     school rows that are new or changed since the previous year
+    store/state_aggregates.parquet  per (year, state_id): school count, and per metric
+                                    the sum and non-null count
+
+Unchanged schools are not stored again, so a year costs roughly its churn rather
+than a full copy; string columns are dictionary-encoded by Parquet. A snapshot
+for any year is rebuilt by taking, for each pseudocode present that year, its
+latest stored row. Trend lines and YoY deltas only read the small aggregate
+table, never the school-level rows. Aggregates are keyed on the map feature id
+(``state_id``) and labelled with its ST_NM, so a state whose spelling changes
+between extracts ("ORISSA" → "ODISHA") stays one line.
+
+    python timeseries.py build data/years          # data/years/<year>/100_prof1.csv, 100_fac.csv
+    python timeseries.py ingest 2024 --prof ... --fac ...
+    python timeseries.py trend infra_index --states BIHAR GOA
+"""
+import argparse
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_prep import METRIC_COLUMNS, load_dataset
+from geo import UNMATCHED_ID, build_state_index, feature_names, load_geojson
+
+STORE_DIR = os.path.join("data", "store")
+AGGREGATES_FILE = "state_aggregates.parquet"
+
+
+def _years(store, kind="keys"):
+    return sorted(int(os.path.splitext(os.path.basename(p))[0])
+                  for p in glob.glob(os.path.join(store, kind, "*.parquet")))
+
+
+def years(store=STORE_DIR):
+    return _years(store)
+
+
+def snapshot(year, store=STORE_DIR, columns=None):
+    """School-level frame for `year`, rebuilt from the delta rows up to that year."""
+    keys = pd.read_parquet(os.path.join(store, "keys", f"{year}.parquet"))["pseudocode"]
+    parts = [
+        pd.read_parquet(os.path.join(store, "rows", f"{y}.parquet"),
+                        columns=None if columns is None else ["pseudocode", *columns])
+        for y in _years(store, "rows") if y <= year
+    ]
+    # later years come last, so keep="last" picks each school's most recent row
+    rows = pd.concat(parts, ignore_index=True).drop_duplicates("pseudocode", keep="last")
+    return rows[rows["pseudocode"].isin(keys)].reset_index(drop=True)
+
+
+def changed_rows(new, old):
+    """Rows of `new` that are absent from `old` or differ from it in any column."""
+    if old is None or old.empty:
+        return new
+    cols = [c for c in new.columns if c != "pseudocode"]
+    prev = old.set_index("pseudocode").reindex(new["pseudocode"])[cols].reset_index(drop=True)
+    cur = new[cols].reset_index(drop=True)
+    same = (cur.eq(prev) | (cur.isna() & prev.isna())).all(axis=1).to_numpy()
+    return new[~same]
+
+
+def state_aggregates(df, year, names, metrics=METRIC_COLUMNS):
+    """Per-state school count plus metric sums and non-null counts for one year.
+
+    Rows are grouped on ``state_id``; ``names`` (feature id → ST_NM) gives the
+    label. States matching no feature keep their own name under UNMATCHED_ID.
+    """
+    label = df["state_id"].map(names).where(df["state_id"] != UNMATCHED_ID, df["state"])
+    grouped = df.assign(state=label).groupby(["state_id", "state"])
+    agg = pd.concat(
+        [grouped.size().rename("schools"),
+         grouped[metrics].sum().add_prefix("sum_"),
+         grouped[metrics].count().add_prefix("n_")],
+        axis=1,
+    ).reset_index()
+    agg.insert(0, "year", year)
+    return agg
+
+
+def ingest_year(year, prof_path, fac_path, store=STORE_DIR):
+    """Validate and load one year's extracts and append them to the store."""
+    existing = years(store)
+    if existing and year <= existing[-1]:
+        raise ValueError(f"{year} is not after the latest stored year {existing[-1]}; rebuild the store instead")
+    df, report = load_dataset(prof_path, fac_path)
+
+    for sub in ("keys", "rows"):
+        os.makedirs(os.path.join(store, sub), exist_ok=True)
+    previous = snapshot(existing[-1], store) if existing else None
+    delta = changed_rows(df, previous)
+    delta.to_parquet(os.path.join(store, "rows", f"{year}.parquet"), index=False)
+    df[["pseudocode"]].to_parquet(os.path.join(store, "keys", f"{year}.parquet"), index=False)
+
+    agg_path = os.path.join(store, AGGREGATES_FILE)
+    agg = state_aggregates(df, year, feature_names(load_geojson()))
+    if os.path.exists(agg_path):
+        agg = pd.concat([pd.read_parquet(agg_path), agg], ignore_index=True)
+    agg.to_parquet(agg_path, index=False)
+    return len(df), len(delta), report
+
+
+def build_store(root, store=STORE_DIR):
+    """(Re)build the store from <root>/<year>/100_prof1.csv + 100_fac.csv, oldest first."""
+    for sub in ("keys", "rows"):
+        for path in glob.glob(os.path.join(store, sub, "*.parquet")):
+            os.remove(path)
+    agg_path = os.path.join(store, AGGREGATES_FILE)
+    if os.path.exists(agg_path):
+        os.remove(agg_path)
+
+    for year_dir in sorted(glob.glob(os.path.join(root, "[0-9]" * 4))):
+        year = int(os.path.basename(year_dir))
+        n, changed, report = ingest_year(
+            year, os.path.join(year_dir, "100_prof1.csv"), os.path.join(year_dir, "100_fac.csv"), store,
+        )
+        print(f"{year}: {n:,} schools, {changed:,} new/changed rows stored, {report.rows_rejected:,} rejected")
+
+
+def aggregates_path(store=STORE_DIR):
+    return os.path.join(store, AGGREGATES_FILE)
+
+
+def load_aggregates(store=STORE_DIR):
+    path = aggregates_path(store)
+    return pd.read_parquet(path) if os.path.exists(path) else None
+
+
+def state_ids(states, geojson):
+    """Feature ids of the dataset state names `states`; names matching no feature are left out."""
+    ids = build_state_index(states, geojson).ids
+    return sorted({i for i in ids.values() if i != UNMATCHED_ID})
+
+
+def trend(agg, metric, ids=None, by_state=False):
+    """Yearly mean of `metric` over the state ids `ids` (all if None), with its YoY delta.
+
+    Combined lines are weighted by schools, since the table keeps sums and
+    counts rather than per-state means. With `by_state` one line per state.
+    """
+    if ids is not None:
+        agg = agg[agg["state_id"].isin(ids)]
+    keys = ["year", "state_id", "state"] if by_state else ["year"]
+    sums = agg.groupby(keys)[[f"sum_{metric}", f"n_{metric}"]].sum()
+    out = (sums[f"sum_{metric}"] / sums[f"n_{metric}"].replace(0, np.nan)).rename(metric).reset_index()
+    if by_state:
+        out["yoy"] = out.sort_values("year").groupby(["state_id", "state"])[metric].diff()
+    else:
+        out["yoy"] = out.sort_values("year")[metric].diff()
+    return out
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--store", default=STORE_DIR)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="rebuild the store from a directory of yearly extracts")
+    b.add_argument("root")
+    i = sub.add_parser("ingest", help="append one year to the store")
+    i.add_argument("year", type=int)
+    i.add_argument("--prof", required=True)
+    i.add_argument("--fac", required=True)
+    t = sub.add_parser("trend", help="print the yearly trend of one metric")
+    t.add_argument("metric", choices=METRIC_COLUMNS)
+    t.add_argument("--states", nargs="*")
+    t.add_argument("--by-state", action="store_true")
+    args = parser.parse_args()
+
+    if args.cmd == "build":
+        build_store(args.root, args.store)
+    elif args.cmd == "ingest":
+        n, changed, _ = ingest_year(args.year, args.prof, args.fac, args.store)
+        print(f"{args.year}: {n:,} schools, {changed:,} new/changed rows stored")
+    else:
+        agg = load_aggregates(args.store)
+        if agg is None:
+            parser.exit(1, f"No trend aggregates in {args.store}; run `python timeseries.py build` first.\n")
+        ids = None if args.states is None else state_ids(args.states, load_geojson())
+        print(trend(agg, args.metric, ids, args.by_state).to_string(index=False))
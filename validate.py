@@ -0,0 +1,165 @@
+"""Data-quality checks run inside the ingestion pass.
+
+``prepare_data()`` reads the extracts in chunks and hands every chunk to
+these checks before it is merged and feature-engineered, so validation costs
+no extra scan over the data. Each check counts its violations per column;
+rows failing a *reject* check are quarantined (kept aside with the reason),
+dropped, or kept, depending on the ``on_error`` policy. *Warn* checks only
+count.
+"""
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+ON_ERROR = ("quarantine", "drop", "keep")
+
+# check → (severity, description)
+CHECKS = {
+    "missing_key":        ("reject", "row has no pseudocode / state"),
+    "missing_value":      ("warn",   "row has no district (kept; absent from district views)"),
+    "duplicate_key":      ("reject", "pseudocode already seen earlier in the file"),
+    "unmapped_code":      ("reject", "code value outside the documented code list"),
+    "negative_count":     ("reject", "count column below zero"),
+    "unmatched_profile":  ("reject", "profile row with no facility row (dropped by the merge)"),
+    "unmatched_facility": ("warn",   "facility row with no profile row (dropped by the merge)"),
+    "unmatched_state":    ("warn",   "state name matches no map feature (missing from the choropleth)"),
+    "zero_denominator":   ("warn",   "ratio denominator is zero"),
+    "ratio_above_one":    ("warn",   "functional count exceeds total count"),
+}
+
+
+@dataclass
+class DataQualityReport:
+    rows_profile:  int = 0
+    rows_facility: int = 0
+    rows_loaded:   int = 0
+    rows_rejected: int = 0
+    violations:    Counter = field(default_factory=Counter)   # (check, column) → rows
+    unmatched_states: list = field(default_factory=list)
+    quarantine:    list = field(default_factory=list, repr=False)
+    quarantine_limit: int = 10_000
+
+    def count(self, check, column, mask):
+        n = int(np.count_nonzero(mask))
+        if n:
+            self.violations[(check, column)] += n
+        return n
+
+    def hold(self, rows, reasons):
+        room = self.quarantine_limit - sum(len(q) for q in self.quarantine)
+        if room > 0 and len(rows):
+            self.quarantine.append(rows.head(room).assign(dq_reason=reasons[:room]))
+
+    def summary(self):
+        """One row per (check, column) with its severity and count."""
+        rows = [
+            {"check": check, "column": column, "severity": CHECKS[check][0], "rows": n,
+             "description": CHECKS[check][1]}
+            for (check, column), n in sorted(self.violations.items())
+        ]
+        return pd.DataFrame(rows, columns=["check", "column", "severity", "rows", "description"])
+
+    def quarantined_rows(self):
+        return pd.concat(self.quarantine, ignore_index=True) if self.quarantine else pd.DataFrame()
+
+    def to_dict(self):
+        return {
+            "rows_profile":  self.rows_profile,
+            "rows_facility": self.rows_facility,
+            "rows_loaded":   self.rows_loaded,
+            "rows_rejected": self.rows_rejected,
+            "violations":    [[c, col, n] for (c, col), n in sorted(self.violations.items())],
+            "unmatched_states": self.unmatched_states,
+        }
+
+    @classmethod
+    def from_dict(cls, d):
+        report = cls(d["rows_profile"], d["rows_facility"], d["rows_loaded"], d["rows_rejected"])
+        report.violations.update({(c, col): n for c, col, n in d["violations"]})
+        report.unmatched_states = d.get("unmatched_states", [])
+        return report
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=1)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def reject_mask(chunk, report, checks):
+    """Run `checks` ((name, column, mask) triples) and return (bad mask, reasons)."""
+    bad = np.zeros(len(chunk), dtype=bool)
+    reasons = np.full(len(chunk), "", dtype=object)
+    for check, column, mask in checks:
+        mask = np.asarray(mask, dtype=bool)
+        report.count(check, column, mask)
+        if CHECKS[check][0] == "reject":
+            new = mask & ~bad
+            reasons[new] = f"{check}:{column}"
+            bad |= mask
+    return bad, reasons
+
+
+def apply_policy(chunk, bad, reasons, report, on_error):
+    """Quarantine, drop or keep the rows flagged by reject_mask()."""
+    if on_error == "keep" or not bad.any():
+        return chunk
+    report.rows_rejected += int(bad.sum())
+    if on_error == "quarantine":
+        report.hold(chunk[bad], reasons[bad])
+    return chunk[~bad]
+
+
+def key_checks(chunk, seen, key="pseudocode", required=("state",), optional=("district",)):
+    """Missing keys and keys repeated within or across chunks; updates `seen`."""
+    checks = [("missing_key", c, chunk[c].isna().to_numpy()) for c in (key, *required)]
+    checks += [("missing_value", c, chunk[c].isna().to_numpy()) for c in optional]
+    keys = chunk[key]
+    dup = keys.duplicated().to_numpy() | keys.isin(seen).to_numpy()
+    checks.append(("duplicate_key", key, dup & keys.notna().to_numpy()))
+    seen.update(keys.dropna().tolist())
+    return checks
+
+
+def code_checks(chunk, code_labels):
+    return [
+        ("unmapped_code", c, ~chunk[c].isin(list(labels)).to_numpy())
+        for c, labels in code_labels.items()
+    ]
+
+
+def count_checks(chunk, count_cols):
+    return [("negative_count", c, (chunk[c] < 0).to_numpy()) for c in count_cols]
+
+
+def ratio_checks(chunk, numerator, denominator):
+    return [
+        ("zero_denominator", denominator, (chunk[denominator] == 0).to_numpy()),
+        ("ratio_above_one",  numerator,   (chunk[numerator] > chunk[denominator]).to_numpy()),
+    ]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from data_prep import FAC_FILE_PATH, PROF_FILE_PATH, load_dataset
+
+    parser = argparse.ArgumentParser(description="Validate the UDISE+ extracts and print a data-quality report")
+    parser.add_argument("--prof", default=PROF_FILE_PATH)
+    parser.add_argument("--fac", default=FAC_FILE_PATH)
+    parser.add_argument("--on-error", choices=ON_ERROR, default="quarantine")
+    parser.add_argument("--quarantine-out", help="write the quarantined rows to this CSV")
+    args = parser.parse_args()
+
+    _, report = load_dataset(args.prof, args.fac, on_error=args.on_error)
+    print(f"profile rows {report.rows_profile:,}  facility rows {report.rows_facility:,}  "
+          f"loaded {report.rows_loaded:,}  rejected {report.rows_rejected:,}")
+    print(report.summary().to_string(index=False))
+    if args.quarantine_out:
+        report.quarantined_rows().to_csv(args.quarantine_out, index=False)